@@ -0,0 +1,44 @@
+"""
+Measures the startup cost of the listloc CLI with 'python -X importtime'.
+
+Each run imports the given modules in a fresh interpreter and reports the cumulative import
+time of every module on the top level, with the best of all runs. The time that listloc adds
+on top of typer is what tests/listloc/test_import_time.py keeps within its budget.
+
+Usage:
+    poetry run python benchmarks/import_time_benchmark.py [--runs 10] [--modules typer listloc.main]
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\S+)$")
+
+
+def measure(modules):
+    code = "; ".join(f"import {module}" for module in modules)
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], check=True, capture_output=True, text=True).stderr
+    times = {}
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        # Modules imported at the top level are not indented, and their cumulative time includes all others
+        if match:
+            times[match.group(3)] = int(match.group(2))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--modules", nargs="+", default=["typer", "listloc.main"])
+    arguments = parser.parse_args()
+    runs = [measure(arguments.modules) for _ in range(arguments.runs)]
+    print(f"{'module':<24}{'best (ms)':>12}{'median (ms)':>14}")
+    for module in arguments.modules:
+        times = sorted(run[module] for run in runs if module in run)
+        print(f"{module:<24}{times[0] / 1000:>12.1f}{times[len(times) // 2] / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
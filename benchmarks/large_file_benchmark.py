@@ -0,0 +1,90 @@
+"""
+Compares peak RSS and wall time of scanning one large source file with the original
+whole-file read plus DOTALL regex, and with the memory-mapped span scanner, both without
+and with the line counting that listing indexes need.
+
+Each path runs in its own subprocess so that peak RSS is measured in isolation. Pages of
+the memory-mapped file that have been searched are file-backed and count towards RSS, but
+unlike the decoded string of the regex path they can be reclaimed by the kernel at any time.
+
+Usage:
+    poetry run python benchmarks/large_file_benchmark.py [--size-mb 256] [--listings 10]
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("regex", "mmap", "mmap-lines")
+
+
+def generate_source_file(path, size_mb, number_of_listings):
+    filler_line = b"# generated data line that contains no listing statements at all\n"
+    filler_lines_per_gap = max(1, (size_mb << 20) // len(filler_line) // (number_of_listings + 1))
+    filler = filler_line * filler_lines_per_gap
+    with open(path, "wb") as f:
+        f.write(filler)
+        for i in range(number_of_listings):
+            f.write(f"# BEGIN LISTING listing_{i}\nprint({i})\n# END LISTING\n".encode("utf-8"))
+            f.write(filler)
+
+
+def scan_with_regex(path):
+    from listloc.extractor.listing import Listing
+    with open(path, "rt", encoding="utf-8") as f:
+        source_code = f.read()
+    pattern = f"{Listing.BEGIN_STATEMENT}.*?{Listing.END_STATEMENT}"
+    return [Listing(listing_string) for listing_string in re.findall(pattern, source_code, flags=re.DOTALL)]
+
+
+def scan_with_mmap(path):
+    from listloc.extractor.source_scanner import SourceScanner
+    return SourceScanner(path).scan().listings
+
+
+def scan_with_mmap_counting_lines(path):
+    from listloc.extractor.source_scanner import SourceScanner
+    return SourceScanner(path, count_lines=True).scan().listings
+
+
+SCANS = {"regex": scan_with_regex, "mmap": scan_with_mmap, "mmap-lines": scan_with_mmap_counting_lines}
+
+
+def run_mode(mode, path):
+    scan = SCANS[mode]
+    start = time.perf_counter()
+    listings = scan(path)
+    wall_time = time.perf_counter() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    max_rss_mb = max_rss / (1 << 20) if sys.platform == "darwin" else max_rss / (1 << 10)
+    print(json.dumps({"mode": mode, "listings": len(listings), "wall_time_s": wall_time, "peak_rss_mb": max_rss_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--listings", type=int, default=10)
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.run_mode:
+        run_mode(arguments.run_mode, arguments.path)
+        return
+    with tempfile.TemporaryDirectory() as directory_path:
+        path = os.path.join(directory_path, "large_source.txt")
+        generate_source_file(path, arguments.size_mb, arguments.listings)
+        print(f"{'mode':<12}{'listings':>10}{'wall time (s)':>16}{'peak RSS (MB)':>16}")
+        for mode in MODES:
+            output = subprocess.run([sys.executable, __file__, "--run-mode", mode, "--path", path], check=True, capture_output=True, text=True).stdout
+            result = json.loads(output)
+            print(f"{result['mode']:<12}{result['listings']:>10}{result['wall_time_s']:>16.3f}{result['peak_rss_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
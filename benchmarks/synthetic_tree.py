@@ -0,0 +1,117 @@
+"""
+Generates synthetic project trees for benchmarking listloc.
+
+The tree holds source files spread over nested directories, some of which declare listings,
+some binary files, and files in excluded directories such as '.git' and 'node_modules' that
+listloc is expected to skip. The same seed always generates the same tree.
+
+Usage:
+    poetry run python benchmarks/synthetic_tree.py PATH [--files 1000] [--depth 3] ...
+"""
+import argparse
+import json
+import os
+import random
+
+NOISE_DIRECTORY_NAMES = (".git", "node_modules")
+FILLER_LINE = "value = compute(value) + 1  # generated line without listing statements\n"
+
+
+class TreeParameters:
+
+    def __init__(self, files=1000, depth=3, file_size_kb=8, listing_density=0.5, binary_ratio=0.1, noise_files=200, seed=0):
+        self.files = files
+        self.depth = depth
+        self.file_size_kb = file_size_kb
+        self.listing_density = listing_density
+        self.binary_ratio = binary_ratio
+        self.noise_files = noise_files
+        self.seed = seed
+
+    @classmethod
+    def add_arguments(cls, parser):
+        defaults = cls()
+        parser.add_argument("--files", type=int, default=defaults.files, help="Number of source files, binary ones included.")
+        parser.add_argument("--depth", type=int, default=defaults.depth, help="Depth of the directory tree below the root.")
+        parser.add_argument("--file-size-kb", type=int, default=defaults.file_size_kb, help="Size of each source file.")
+        parser.add_argument("--listing-density", type=float, default=defaults.listing_density, help="Average number of listings declared per text file.")
+        parser.add_argument("--binary-ratio", type=float, default=defaults.binary_ratio, help="Fraction of source files that are binary.")
+        parser.add_argument("--noise-files", type=int, default=defaults.noise_files, help="Number of files inside excluded directories such as '.git'.")
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+
+    @classmethod
+    def from_arguments(cls, arguments):
+        return cls(arguments.files, arguments.depth, arguments.file_size_kb, arguments.listing_density, arguments.binary_ratio, arguments.noise_files, arguments.seed)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def generate_tree(base_directory_path, parameters: TreeParameters):
+    """
+    Writes the tree into the given directory and returns a summary of what was written, with
+    the number and total size of the source files and the number of declared listings.
+    """
+    rng = random.Random(parameters.seed)
+    directory_paths = _generate_directory_paths(base_directory_path, parameters.depth)
+    summary = {"source_files": 0, "source_bytes": 0, "listings": 0, "binary_files": 0}
+    for i in range(parameters.files):
+        file_path = os.path.join(rng.choice(directory_paths), f"source_{i}.py")
+        if rng.random() < parameters.binary_ratio:
+            content = rng.randbytes(parameters.file_size_kb << 10)
+            summary["binary_files"] += 1
+        else:
+            number_of_listings = _number_of_listings(rng, parameters.listing_density)
+            content = _text_content(i, parameters.file_size_kb << 10, number_of_listings).encode("utf-8")
+            summary["listings"] += number_of_listings
+        _write_file(file_path, content)
+        summary["source_files"] += 1
+        summary["source_bytes"] += len(content)
+    for i in range(parameters.noise_files):
+        noise_directory_path = os.path.join(base_directory_path, NOISE_DIRECTORY_NAMES[i % len(NOISE_DIRECTORY_NAMES)], f"objects_{i % 16:02x}")
+        _write_file(os.path.join(noise_directory_path, f"noise_{i}"), _text_content(i, parameters.file_size_kb << 10, 1).encode("utf-8"))
+    return summary
+
+
+def _generate_directory_paths(base_directory_path, depth, branching=3):
+    directory_paths = [base_directory_path]
+    level = [base_directory_path]
+    for _ in range(depth):
+        level = [os.path.join(parent, f"package_{j}") for parent in level for j in range(branching)]
+        directory_paths.extend(level)
+    for directory_path in directory_paths:
+        os.makedirs(directory_path, exist_ok=True)
+    return directory_paths
+
+
+def _number_of_listings(rng, listing_density):
+    whole = int(listing_density)
+    return whole + (1 if rng.random() < listing_density - whole else 0)
+
+
+def _text_content(index, size, number_of_listings):
+    filler_lines = max(1, size // len(FILLER_LINE) // (number_of_listings + 1))
+    filler = FILLER_LINE * filler_lines
+    parts = [filler]
+    for j in range(number_of_listings):
+        parts.append(f"# BEGIN LISTING listing_{index}_{j}\ndef listing_{index}_{j}():\n    return {j}\n# END LISTING\n")
+        parts.append(filler)
+    return "".join(parts)
+
+
+def _write_file(file_path, content):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as f:
+        f.write(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    TreeParameters.add_arguments(parser)
+    arguments = parser.parse_args()
+    print(json.dumps(generate_tree(arguments.path, TreeParameters.from_arguments(arguments)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
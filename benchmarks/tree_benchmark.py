@@ -0,0 +1,130 @@
+"""
+Times extraction, pruning and clearing on a synthetic project tree, and saves the results as
+JSON so that they can be compared between versions.
+
+Each operation runs in its own subprocess so that peak RSS is measured in isolation. Within
+that process the operation first runs cold, on a tree without listing files or scan manifest
+and with nothing imported or cached yet, and then warm, repeating it on the tree left by the
+previous run. Clearing is timed on a freshly extracted tree each time, whose extraction is
+not timed. Throughput counts every source file and byte in the generated tree, binary files
+included, since all of them are at least opened.
+
+Usage:
+    poetry run python benchmarks/tree_benchmark.py [--files 1000] [--warm-runs 3] [--output results.json] [--compare previous.json]
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic_tree import TreeParameters, generate_tree
+
+OPERATIONS = ("extract", "prune", "clear")
+
+
+def create_extractor(path):
+    from listloc.extractor.action_logger import ActionLogger
+    from listloc.extractor.listing_extractor import ListingExtractor
+    return ListingExtractor(path, ActionLogger(path))
+
+
+def time_operation(operation, path):
+    if operation == "clear":
+        create_extractor(path).extract_all_listings()
+        start = time.perf_counter()
+        create_extractor(path).clear_all_listing_extractions()
+        return time.perf_counter() - start
+    start = time.perf_counter()
+    create_extractor(path).extract_all_listings(prune=operation == "prune")
+    return time.perf_counter() - start
+
+
+def run_operation(operation, path, warm_runs):
+    create_extractor(path).clear_all_listing_extractions()
+    wall_times = [time_operation(operation, path) for _ in range(warm_runs + 1)]
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    max_rss_mb = max_rss / (1 << 20) if sys.platform == "darwin" else max_rss / (1 << 10)
+    print(json.dumps({"wall_times_s": wall_times, "peak_rss_mb": max_rss_mb}))
+
+
+def listloc_version():
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        return version("listloc")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def result_rows(operation, output, tree):
+    wall_times = output["wall_times_s"]
+    runs = [("cold", wall_times[0])]
+    if len(wall_times) > 1:
+        runs.append(("warm", min(wall_times[1:])))
+    return [{
+        "operation": operation,
+        "run": run,
+        "wall_time_s": wall_time,
+        "files_per_s": tree["source_files"] / wall_time,
+        "mb_per_s": tree["source_bytes"] / (1 << 20) / wall_time,
+        "peak_rss_mb": output["peak_rss_mb"],
+    } for run, wall_time in runs]
+
+
+def print_results(results, previous_results=None):
+    previous_wall_times = {(row["operation"], row["run"]): row["wall_time_s"] for row in previous_results or ()}
+    header = f"{'operation':<10}{'run':<6}{'wall time (s)':>14}{'files/s':>12}{'MB/s':>10}{'peak RSS (MB)':>15}"
+    print(header + (f"{'vs previous':>13}" if previous_results else ""))
+    for row in results:
+        line = f"{row['operation']:<10}{row['run']:<6}{row['wall_time_s']:>14.3f}{row['files_per_s']:>12.0f}{row['mb_per_s']:>10.1f}{row['peak_rss_mb']:>15.1f}"
+        previous_wall_time = previous_wall_times.get((row["operation"], row["run"]))
+        if previous_wall_time:
+            line += f"{row['wall_time_s'] / previous_wall_time:>12.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    TreeParameters.add_arguments(parser)
+    parser.add_argument("--warm-runs", type=int, default=3, help="Number of warm runs per operation, of which the fastest is reported.")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--output", help="File to save the results to as JSON.")
+    parser.add_argument("--compare", help="JSON file of earlier results to compare wall times with.")
+    parser.add_argument("--run-operation", choices=OPERATIONS, help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.run_operation:
+        run_operation(arguments.run_operation, arguments.path, arguments.warm_runs)
+        return
+    parameters = TreeParameters.from_arguments(arguments)
+    with tempfile.TemporaryDirectory() as path:
+        tree = generate_tree(path, parameters)
+        results = []
+        for operation in arguments.operations:
+            command = [sys.executable, __file__, "--run-operation", operation, "--path", path, "--warm-runs", str(arguments.warm_runs)]
+            output = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+            results.extend(result_rows(operation, output, tree))
+    previous_results = None
+    if arguments.compare:
+        with open(arguments.compare, "rt", encoding="utf-8") as f:
+            previous_results = json.load(f)["results"]
+    print_results(results, previous_results)
+    if arguments.output:
+        report = {
+            "listloc_version": listloc_version(),
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": parameters.to_dict(),
+            "tree": tree,
+            "results": results,
+        }
+        with open(arguments.output, "wt", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
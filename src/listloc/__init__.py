@@ -0,0 +1,5 @@
+from listloc.api import iter_listings, extract_to_dict
+from listloc.extractor.listing import Listing, ListingError
+from listloc.extractor.listing_syntax import ListingSyntax
+
+__all__ = ["iter_listings", "extract_to_dict", "Listing", "ListingError", "ListingSyntax"]
\ No newline at end of file
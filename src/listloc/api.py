@@ -0,0 +1,45 @@
+import os
+from collections.abc import Iterator
+from listloc.extractor.listing import Listing
+from listloc.extractor.listing_constants import ListingConstants
+from listloc.extractor.listing_syntax import ListingSyntax
+from listloc.extractor.path_filter import PathFilter
+from listloc.extractor.source_scanner import SourceScanner
+from listloc.extractor.tree_walker import TreeWalker
+
+
+def iter_listings(path, exclude_patterns=(), use_ignore_files=True, syntax: ListingSyntax = None) -> Iterator[tuple[str, Listing]]:
+    """
+    Yields a (source_path, listing) pair for every listing declared in the given source file,
+    or in the source files under the given directory, without writing anything to disk.
+    Directories are walked with the same exclusions as 'listloc extract', and listings are
+    declared with the markers of the given syntax, 'BEGIN LISTING' and 'END LISTING' by default.
+    """
+    for source_file_path in _source_file_paths(path, exclude_patterns, use_ignore_files):
+        source_scan = SourceScanner(source_file_path, syntax=syntax).scan()
+        if source_scan.error is not None:
+            raise source_scan.error
+        for listing in source_scan.listings:
+            yield source_file_path, listing
+
+
+def extract_to_dict(path, exclude_patterns=(), use_ignore_files=True, syntax: ListingSyntax = None) -> dict[str, str]:
+    """
+    Returns the content of every listing declared under the given path, keyed by the path of
+    the listing file that 'listloc extract' would write, relative to the given directory (or
+    to the directory of the given source file).
+    """
+    base_directory_path = path if os.path.isdir(path) else os.path.dirname(path)
+    listings = {}
+    for source_file_path, listing in iter_listings(path, exclude_patterns, use_ignore_files, syntax):
+        listing_file_path = os.path.join(os.path.dirname(source_file_path), ListingConstants.LISTING_DIRECTORY_NAME, listing.name + ListingConstants.LISTING_FILE_EXTENSION)
+        listings[os.path.relpath(listing_file_path, base_directory_path)] = listing.content
+    return listings
+
+
+def _source_file_paths(path, exclude_patterns, use_ignore_files):
+    if os.path.isfile(path):
+        return [path]
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"Expected a file or directory path, but got: '{path}'")
+    return TreeWalker(path, PathFilter(path, exclude_patterns, use_ignore_files)).source_file_paths()
@@ -1,41 +1,99 @@
-from rich import print
-from rich.rule import Rule
+import json
+from enum import Enum
 from listloc.extractor.listing_constants import ListingConstants
 
 
-class ActionLogger:
+def _print(renderable):
+    # rich is imported on first output only, since most runs print no more than a summary
+    from rich import print
+    print(renderable)
+
+
+def _summary_rule():
+    from rich.rule import Rule
+    return Rule(characters="--", align="left", style="white")
+
+
+class LogOutput(str, Enum):
+    TEXT = "text"
+    JSON = "json"
+    NDJSON = "ndjson"
+
 
-    def __init__(self, base_directory_path, verbose=False):
+class ActionLogger:
+    """
+    Logs the actions taken on listing files and summarizes them. With text output, actions are
+    printed when verbose and summarized in sentences. With NDJSON output, every action is
+    printed as one JSON event per line as it happens, followed by a summary event, while JSON
+    output prints a single document with all events and the summary at the end.
+    """
+
+    def __init__(self, base_directory_path, verbose=False, output=LogOutput.TEXT):
         self.__extracted_files = 0
+        self.__skipped_files = 0
+        self.__bundled_listings = 0
         self.__created = PathLogger()
+        self.__unchanged = PathLogger()
         self.__deleted = PathLogger()
         self.__BASE_DIRECTORY_PATH = base_directory_path
         self.__verbose = verbose
+        self.__output = LogOutput(output)
+        self.__events = [] if self.__output == LogOutput.JSON else None
 
     def log_extracted(self, path, number_of_listings):
         if number_of_listings:
             self.__extracted_files += 1
+            self.__emit("extracted", source=path, listings=number_of_listings)
             self.__print_if_verbose(f"Extracted {number_of_listings} listing{self.__plural_suffix(number_of_listings)} from '{path}'")
 
+    def log_skipped(self, path, number_of_listings):
+        if number_of_listings:
+            self.__skipped_files += 1
+            self.__emit("skipped", source=path, listings=number_of_listings)
+            self.__print_if_verbose(f"Skipped unchanged '{path}'")
+
     def log_written_file(self, path):
-        self.__log("Wrote", path, self.__created)
+        self.__log("Wrote", "written", path, self.__created)
+
+    def log_updated_file(self, path):
+        self.__log("Updated", "updated", path, self.__created)
+
+    def log_unchanged_file(self, path):
+        self.__log("Unchanged", "unchanged", path, self.__unchanged)
+
+    def log_bundle(self, path, number_of_listings, written):
+        self.__bundled_listings += number_of_listings
+        if written:
+            self.__log("Wrote", "written", path, self.__created)
+        else:
+            self.__log("Unchanged", "unchanged", path, self.__unchanged)
 
     def log_created_directory(self, path):
-        self.__log("Created", path, self.__created)
+        self.__log("Created", "created", path, self.__created)
 
     def log_deleted_file(self, path):
-        self.__log("Deleted", path, self.__deleted)
+        self.__log("Deleted", "deleted", path, self.__deleted)
 
     def log_removed_directory(self, path):
-        self.__log("Removed", path, self.__deleted)
+        self.__log("Removed", "removed", path, self.__deleted)
 
-    def __log(self, action_keyword, path, path_logger):
+    def __log(self, action_keyword, event, path, path_logger):
         path_logger.log_path(path)
+        self.__emit(event, path=path)
         self.__print_if_verbose(f"{action_keyword} '{path}'")
 
     def __print_if_verbose(self, string):
-        if self.__verbose:
-            print(string)
+        if self.__verbose and self.__output == LogOutput.TEXT:
+            _print(string)
+
+    def __emit(self, event, **fields):
+        if self.__output == LogOutput.TEXT:
+            return
+        record = {"event": event, **fields}
+        if self.__events is not None:
+            self.__events.append(record)
+        else:
+            print(json.dumps(record), flush=True)
 
     def summarize_or_note_no_extractions(self):
         self.__summarize(f"No listings to extract from '{self.__BASE_DIRECTORY_PATH}'")
@@ -43,41 +101,85 @@ class ActionLogger:
     def summarize_or_note_no_clearings(self):
         self.__summarize(f"Nothing to clear in '{self.__BASE_DIRECTORY_PATH}'")
 
+    def summarize_changes(self):
+        if self.__output != LogOutput.TEXT:
+            self.__print_summary_event()
+        elif not self.__no_actions_logged():
+            self.__print_summary()
+
+    def log_error(self, error):
+        if self.__output == LogOutput.TEXT:
+            _print(f"Error: {error}")
+        else:
+            self.__emit("error", message=str(error))
+
     def __summarize(self, no_actions_message):
+        if self.__output != LogOutput.TEXT:
+            self.__print_summary_event()
+            return
         if self.__no_actions_logged():
-            print(no_actions_message)
+            _print(no_actions_message)
             return
-        self.__print_if_verbose(Rule(characters="--", align="left", style="white"))
+        self.__print_summary()
+
+    def __print_summary_event(self):
+        summary = {
+            "base_directory": self.__BASE_DIRECTORY_PATH,
+            "extracted_listings": self.__number_of_extracted_files(),
+            "source_files": self.__extracted_files,
+            "unchanged_listings": self.__unchanged.number_of_listing_files(),
+            "skipped_source_files": self.__skipped_files,
+            "deleted_listings": self.__deleted.number_of_listing_files(),
+        }
+        if self.__events is None:
+            print(json.dumps({"event": "summary", **summary}), flush=True)
+            return
+        print(json.dumps({"events": self.__events, "summary": summary}, indent=2))
+        self.__events = []
+
+    def __number_of_extracted_files(self):
+        return self.__created.number_of_listing_files() + self.__unchanged.number_of_listing_files() + self.__bundled_listings
+
+    def __print_summary(self):
+        if self.__verbose:
+            _print(_summary_rule())
         number_of_deleted_files = self.__deleted.number_of_listing_files()
         self.__print_concluding_message(number_of_deleted_files, f"Deleted a total of {number_of_deleted_files} extracted listing{self.__plural_suffix(number_of_deleted_files)}")
-        number_of_written_files = self.__created.number_of_listing_files()
-        self.__print_concluding_message(number_of_written_files, f"Extracted a total of {number_of_written_files} listing{self.__plural_suffix(number_of_written_files)} from {self.__extracted_files} source file{self.__plural_suffix(self.__extracted_files)}")
+        number_of_unchanged_files = self.__unchanged.number_of_listing_files()
+        number_of_extracted_files = self.__number_of_extracted_files()
+        self.__print_concluding_message(number_of_extracted_files, f"Extracted a total of {number_of_extracted_files} listing{self.__plural_suffix(number_of_extracted_files)} from {self.__extracted_files} source file{self.__plural_suffix(self.__extracted_files)}")
+        self.__print_concluding_message(number_of_unchanged_files, f"Left {number_of_unchanged_files} listing{self.__plural_suffix(number_of_unchanged_files)} unchanged")
+        self.__print_concluding_message(self.__skipped_files, f"Skipped {self.__skipped_files} unchanged source file{self.__plural_suffix(self.__skipped_files)}")
 
     def __no_actions_logged(self):
-        return self.__created.number_of_paths() == 0 and self.__deleted.number_of_paths() == 0
+        return self.__created.number_of_paths() == 0 and self.__deleted.number_of_paths() == 0 and self.__unchanged.number_of_paths() == 0 and self.__skipped_files == 0
             
     def __print_concluding_message(self, number_of_files, message):
         if number_of_files:
-            print(message)
+            _print(message)
 
     def __plural_suffix(self, count):
         return "s" if count > 1 else ""
 
 
 class PathLogger:
+    """
+    Counts logged paths by kind as they are logged, without keeping the paths themselves,
+    since a summary needs no more than the counts and verbose output prints each path as it
+    is logged.
+    """
 
     def __init__(self):
-        self.__paths = []
+        self.__number_of_paths = 0
+        self.__number_of_listing_files = 0
 
     def log_path(self, path: str):
-        self.__paths.append(path)
+        self.__number_of_paths += 1
+        if path.endswith(ListingConstants.LISTING_FILE_EXTENSION):
+            self.__number_of_listing_files += 1
 
     def number_of_paths(self):
-        return len(self.__paths)
-    
+        return self.__number_of_paths
+
     def number_of_listing_files(self):
-        files = 0
-        for path in self.__paths:
-            if path.endswith(ListingConstants.LISTING_FILE_EXTENSION):
-                files += 1
-        return files
\ No newline at end of file
+        return self.__number_of_listing_files
\ No newline at end of file
@@ -0,0 +1,68 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncExtractionPipeline:
+    """
+    Runs an extraction as three overlapping asyncio stages, for file systems where every
+    blocking call has a high latency. A producer walks the tree, a bounded number of readers
+    scan source files concurrently, and a single writer applies the scans in walk order, so
+    the logged actions, summaries and errors are identical to a serial run. The queue between
+    the producer and the writer holds a bounded window of scans, which holds back the walk
+    and the reads whenever the writer falls behind.
+
+    asyncio has no non-blocking file operations, so each stage runs its blocking calls on its
+    own threads. The writer also creates the scanners, since those read the scan manifest and
+    listing index that it updates, so that shared state is only ever touched by one thread.
+    """
+    __END = object()
+
+    def __init__(self, readers, window):
+        self.__readers = readers
+        self.__window = window
+
+    def run(self, file_extractors, process):
+        """
+        Scans the source file of every file extractor and calls process with each file
+        extractor and its scan, in walk order.
+        """
+        walker_executor = ThreadPoolExecutor(max_workers=1)
+        reader_executor = ThreadPoolExecutor(max_workers=self.__readers)
+        writer_executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            asyncio.run(self.__run(file_extractors, process, walker_executor, reader_executor, writer_executor))
+        finally:
+            for executor in (walker_executor, reader_executor, writer_executor):
+                executor.shutdown(cancel_futures=True)
+
+    async def __run(self, file_extractors, process, walker_executor, reader_executor, writer_executor):
+        pending_scans = asyncio.Queue(maxsize=self.__window)
+        producer = asyncio.create_task(self.__produce(file_extractors, pending_scans, walker_executor, reader_executor, writer_executor))
+        try:
+            await self.__consume(pending_scans, process, writer_executor)
+            await producer
+        finally:
+            producer.cancel()
+
+    async def __produce(self, file_extractors, pending_scans, walker_executor, reader_executor, writer_executor):
+        loop = asyncio.get_running_loop()
+        file_extractor_iterator = iter(file_extractors)
+        try:
+            while True:
+                file_extractor = await loop.run_in_executor(walker_executor, next, file_extractor_iterator, self.__END)
+                if file_extractor is self.__END:
+                    return
+                scanner = await loop.run_in_executor(writer_executor, file_extractor.scanner)
+                await pending_scans.put((file_extractor, loop.run_in_executor(reader_executor, scanner.scan)))
+        finally:
+            await pending_scans.put(self.__END)
+
+    async def __consume(self, pending_scans, process, writer_executor):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending_scan = await pending_scans.get()
+            if pending_scan is self.__END:
+                return
+            file_extractor, scan_future = pending_scan
+            source_scan = await scan_future
+            await loop.run_in_executor(writer_executor, process, file_extractor, source_scan)
@@ -0,0 +1,94 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+class ExtractionStats:
+    """
+    Time spent in each phase of an extraction, and counts of what was processed. Phases that
+    run on worker threads or processes are timed by each scanner and added up here when the
+    scan is applied, so with more than one job their times are the sum over all workers and
+    can exceed the total wall time.
+    """
+    PHASES = ("walk", "read", "hash", "encoding_check", "parse", "listing_construction", "write", "prune")
+    COUNTERS = ("source_files", "files_skipped", "files_parsed", "files_from_parse_cache", "binary_files", "bytes_read", "listings_written", "listings_unchanged")
+
+    def __init__(self):
+        self.__phase_times = dict.fromkeys(self.PHASES, 0.0)
+        self.__counts = dict.fromkeys(self.COUNTERS, 0)
+        self.__start_time = time.perf_counter()
+        self.__total_time = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__phase_times[name] += time.perf_counter() - start
+
+    def timed_iteration(self, name, iterable):
+        """
+        Yields from the iterable while adding the time spent producing each item to the phase.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.__phase_times[name] += time.perf_counter() - start
+                return
+            self.__phase_times[name] += time.perf_counter() - start
+            yield item
+
+    def add_phase_times(self, phase_times):
+        for name, seconds in phase_times.items():
+            self.__phase_times[name] += seconds
+
+    def count(self, name, number=1):
+        self.__counts[name] += number
+
+    def record_scan(self, source_scan):
+        self.__counts["source_files"] += 1
+        self.__counts["bytes_read"] += source_scan.bytes_read
+        if source_scan.unchanged:
+            self.__counts["files_skipped"] += 1
+        elif source_scan.cached:
+            self.__counts["files_from_parse_cache"] += 1
+        elif source_scan.is_text:
+            self.__counts["files_parsed"] += 1
+        elif source_scan.bytes_read:
+            self.__counts["binary_files"] += 1
+        if source_scan.phase_times is not None:
+            self.add_phase_times(source_scan.phase_times)
+
+    def stop(self):
+        self.__total_time = time.perf_counter() - self.__start_time
+
+    @property
+    def total_time(self):
+        return self.__total_time if self.__total_time is not None else time.perf_counter() - self.__start_time
+
+    def to_dict(self):
+        return {
+            "total_time_s": self.total_time,
+            "phase_times_s": dict(self.__phase_times),
+            "counts": dict(self.__counts),
+        }
+
+    def write_json(self, path):
+        with open(path, "wt", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report_lines(self):
+        total_time = self.total_time
+        lines = [f"{'phase':<22}{'time (s)':>10}{'share':>8}"]
+        for name, seconds in self.__phase_times.items():
+            share = seconds / total_time if total_time else 0.0
+            lines.append(f"{name:<22}{seconds:>10.3f}{share:>8.1%}")
+        lines.append(f"{'total':<22}{total_time:>10.3f}")
+        lines.append("")
+        for name, number in self.__counts.items():
+            lines.append(f"{name:<22}{number:>10}")
+        return lines
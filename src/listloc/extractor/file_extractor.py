@@ -1,53 +1,115 @@
-import re
 import os
 from listloc.extractor.listing_constants import ListingConstants
-from listloc.extractor.listing import Listing
 from listloc.extractor.action_logger import ActionLogger
+from listloc.extractor.scan_manifest import ScanManifest
+from listloc.extractor.listing_writer import ListingWriter
+from listloc.extractor.extraction_stats import ExtractionStats
+from listloc.extractor.listing_index import ListingIndex
+from listloc.extractor.parse_cache import ParseCache
+from listloc.extractor.listing_syntax import ListingSyntax
+from listloc.extractor.source_scanner import SourceScanner, SourceScan
 
 class FileExtractor:
+    __ABSENT = "absent"
+    __CHANGED = "changed"
+    __UNCHANGED = "unchanged"
 
-    def __init__(self, source_file_path, action_logger: ActionLogger):
+    def __init__(self, source_file_path, action_logger: ActionLogger, manifest: ScanManifest = None, listing_writer: ListingWriter = None, stats: ExtractionStats = None, listing_index: ListingIndex = None, parse_cache: ParseCache = None, syntax: ListingSyntax = None, stale_listing_file_paths: set = None):
         self.__source_file_path = source_file_path
         self.__parent_directory_path = os.path.dirname(self.__source_file_path)
         self.__listing_directory_path = os.path.join(self.__parent_directory_path, ListingConstants.LISTING_DIRECTORY_NAME)
         self.__logger = action_logger
+        self.__manifest = manifest
+        self.__listing_writer = listing_writer or ListingWriter()
+        self.__stats = stats
+        self.__listing_index = listing_index
+        self.__parse_cache = parse_cache
+        self.__syntax = syntax
+        self.__stale_listing_file_paths = stale_listing_file_paths
 
     def extract_listings(self):
         """
         Extracts every valid code listing from the given source file and saves their contents 
         in their own designated files. The listing files will be stored in their own directory
         located in the directory of the code file that is extracted from. A valid listing is 
-        the content in between the statements 'BEGIN LISTING <name>' and 'END LISTING'. 
-        The <name> argument decides the listing file names.
+        the content in between the statements 'BEGIN LISTING <name>' and 'END LISTING', or
+        between the markers of the given syntax. The <name> argument decides the listing file
+        names.
+
+        When a scan manifest is given, source files that are unchanged since the last run
+        are skipped, and listings that the source file no longer declares are deleted unless
+        another source file still produces them. If a set of stale listing file paths is
+        given, they are added to it instead, to be deleted once every source file is
+        extracted. When a listing index is given, the entries of the source file in it are
+        updated as well.
         """
-        if not self.__is_utf8_encoding():
-            return
-        with open(self.__source_file_path, "rt", encoding="utf-8") as f:
-            source_code = f.read()
-            pattern = f"{Listing.BEGIN_STATEMENT}.*?{Listing.END_STATEMENT}"
-            listing_strings = re.findall(pattern, source_code, flags=re.DOTALL)
-            listings = self.__construct_listings(listing_strings)
-            self.__logger.log_extracted(self.__source_file_path, len(listings))
-            self.__write_listing_files(listings)
-
-    def __is_utf8_encoding(self, blocksize=8192):
-        try:
-            with open(self.__source_file_path, 'rb') as f:
-                chunk = f.read(blocksize)
-            # If it decodes to UTF-8 without error, assume it's a text file
-            chunk.decode('utf-8')
-            return True
-        except (UnicodeDecodeError, OSError):
-            return False
-
-    def __construct_listings(self, listing_strings):
-        listings = []
-        for listing_string in listing_strings:
-            try:
-                listings.append(Listing(listing_string))
-            except Exception as e:
-                raise type(e)(f"In file '{self.__source_file_path}': {e}") from e
-        return listings
+        self.apply_scan(self.scanner().scan())
+
+    @property
+    def source_file_path(self):
+        return self.__source_file_path
+
+    def scanner(self):
+        manifest_entry = self.__manifest.entry(self.__source_file_path) if self.__manifest is not None else None
+        if manifest_entry is not None and self.__listing_index is not None and not self.__listing_index.covers(self.__source_file_path, manifest_entry["listings"]):
+            # The source file is parsed again to fill in an index that is missing or outdated
+            manifest_entry = None
+        count_lines = self.__listing_index is not None and self.__listing_index.indexes(self.__source_file_path)
+        return SourceScanner(self.__source_file_path, manifest_entry, track_changes=self.__manifest is not None, record_phase_times=self.__stats is not None, parse_cache=self.__parse_cache, syntax=self.__syntax, count_lines=count_lines)
+
+    def apply_scan(self, source_scan: SourceScan):
+        """
+        Logs, writes and records the outcome of a scan of this extractor's source file, and
+        returns the paths of the listing files that the source file currently produces.
+        """
+        if self.__manifest is not None:
+            self.__manifest.mark_seen(self.__source_file_path)
+        if source_scan.error is not None:
+            raise source_scan.error
+        if source_scan.unchanged:
+            listing_names = self.__manifest.listing_names(self.__source_file_path)
+            self.__manifest.record(self.__source_file_path, source_scan.stat_result, source_scan.digest, listing_names)
+            self.__logger.log_skipped(self.__source_file_path, len(listing_names))
+            return [self.__listing_file_path(name) for name in listing_names]
+        if source_scan.is_text:
+            self.__logger.log_extracted(self.__source_file_path, len(source_scan.listings))
+            self.__write_listing_files(source_scan.listings)
+        if self.__manifest is not None and source_scan.stat_result is not None:
+            self.__update_manifest(source_scan)
+        if self.__listing_index is not None:
+            self.__listing_index.record(self.__source_file_path, source_scan.listings)
+        return [self.__listing_file_path(listing.name) for listing in source_scan.listings]
+
+    def collect_listings(self, source_scan: SourceScan):
+        """
+        Logs the outcome of a scan of this extractor's source file and returns its listings,
+        without writing any listing files.
+        """
+        if source_scan.error is not None:
+            raise source_scan.error
+        if source_scan.is_text:
+            self.__logger.log_extracted(self.__source_file_path, len(source_scan.listings))
+        return source_scan.listings
+
+    def __update_manifest(self, source_scan):
+        listing_names = [listing.name for listing in source_scan.listings]
+        stale_listing_names = set(self.__manifest.listing_names(self.__source_file_path)) - set(listing_names)
+        self.__manifest.record(self.__source_file_path, source_scan.stat_result, source_scan.digest, listing_names)
+        self.__delete_stale_listing_files(stale_listing_names)
+
+    def remove_extracted_listings(self):
+        """
+        Deletes the listing files recorded in the scan manifest for a source file that no longer
+        exists, and removes its listing directory if it is left empty.
+        """
+        listing_names = self.__manifest.listing_names(self.__source_file_path)
+        self.__manifest.forget(self.__source_file_path)
+        self.__delete_stale_listing_files(listing_names)
+        if self.__listing_index is not None:
+            self.__listing_index.forget_source(self.__source_file_path)
+
+    def __listing_file_path(self, listing_name):
+        return os.path.join(self.__listing_directory_path, listing_name + ListingConstants.LISTING_FILE_EXTENSION)
    
     def __write_listing_files(self, listings):
         if listings:
@@ -63,7 +125,61 @@ class FileExtractor:
             pass
 
     def __write_listing_file(self, listing):
-        write_path = os.path.join(self.__listing_directory_path, listing.name + ListingConstants.LISTING_FILE_EXTENSION)
-        with open(write_path, "wt", encoding="utf-8") as f:
-            f.write(listing.content)
-            self.__logger.log_written_file(write_path)
\ No newline at end of file
+        write_path = self.__listing_file_path(listing.name)
+        content_bytes = listing.content.replace("\n", os.linesep).encode("utf-8")
+        existing_state = self.__existing_file_state(write_path, content_bytes)
+        if existing_state == self.__UNCHANGED:
+            self.__logger.log_unchanged_file(write_path)
+            self.__count("listings_unchanged")
+            return
+        self.__listing_writer.write(write_path, content_bytes)
+        self.__count("listings_written")
+        if existing_state == self.__ABSENT:
+            self.__logger.log_written_file(write_path)
+        else:
+            self.__logger.log_updated_file(write_path)
+
+    def __count(self, name):
+        if self.__stats is not None:
+            self.__stats.count(name)
+
+    def __existing_file_state(self, path, content_bytes):
+        try:
+            if os.stat(path).st_size != len(content_bytes):
+                return self.__CHANGED
+            with open(path, "rb") as f:
+                existing_bytes = f.read()
+        except FileNotFoundError:
+            return self.__ABSENT
+        return self.__UNCHANGED if existing_bytes == content_bytes else self.__CHANGED
+
+    def __delete_stale_listing_files(self, listing_names):
+        listing_file_paths = [self.__listing_file_path(name) for name in listing_names]
+        if self.__stale_listing_file_paths is not None:
+            self.__stale_listing_file_paths.update(listing_file_paths)
+        else:
+            self.delete_stale_listing_files(listing_file_paths, self.__logger, self.__manifest)
+
+    @staticmethod
+    def delete_stale_listing_files(listing_file_paths, action_logger: ActionLogger, manifest: ScanManifest, listing_file_paths_to_keep=frozenset()):
+        """
+        Deletes the given listing files, except those to keep and those that a source file
+        recorded in the manifest still produces, and removes their listing directories if
+        they are left empty.
+        """
+        listing_directory_paths = set()
+        for path in sorted(listing_file_paths):
+            if path in listing_file_paths_to_keep or manifest.records_listing(path):
+                continue
+            listing_directory_paths.add(os.path.dirname(path))
+            try:
+                os.remove(path)
+                action_logger.log_deleted_file(path)
+            except FileNotFoundError:
+                pass
+        for listing_directory_path in sorted(listing_directory_paths):
+            try:
+                os.rmdir(listing_directory_path)
+                action_logger.log_removed_directory(listing_directory_path)
+            except OSError:
+                pass
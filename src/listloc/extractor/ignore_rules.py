@@ -0,0 +1,154 @@
+import os
+import re
+
+
+class IgnoreRules:
+    """
+    The compiled patterns of a single '.gitignore' or '.listlocignore' file. Paths are matched
+    relative to the directory containing the ignore file, following the gitignore rules: the
+    last matching pattern wins, '!' negates, a trailing '/' only matches directories, and a
+    pattern containing '/' is anchored to the ignore file's directory.
+    """
+
+    def __init__(self, lines):
+        self.__rules = []
+        for line in lines:
+            rule = self.__parse_rule(line)
+            if rule is not None:
+                self.__rules.append(rule)
+        self.__has_negations = any(negated for _, negated, _ in self.__rules)
+        self.__any_pattern = self.__combine(pattern for pattern, _, _ in self.__rules)
+        self.__file_pattern = self.__combine(pattern for pattern, _, directory_only in self.__rules if not directory_only)
+
+    @classmethod
+    def from_file(cls, path):
+        try:
+            with open(path, "rt", encoding="utf-8", errors="replace") as f:
+                return cls(f.read().splitlines())
+        except OSError:
+            return None
+
+    def __bool__(self):
+        return bool(self.__rules)
+
+    def match(self, relative_path, is_directory):
+        """
+        Returns True if the path is ignored, False if it is explicitly re-included by a negated
+        pattern and None if no pattern matches it.
+        """
+        if not self.__has_negations:
+            combined_pattern = self.__any_pattern if is_directory else self.__file_pattern
+            if combined_pattern is not None and combined_pattern.fullmatch(relative_path):
+                return True
+            return None
+        for pattern, negated, directory_only in reversed(self.__rules):
+            if directory_only and not is_directory:
+                continue
+            if pattern.fullmatch(relative_path):
+                return not negated
+        return None
+
+    @staticmethod
+    def __combine(patterns):
+        sources = [f"(?:{pattern.pattern})" for pattern in patterns]
+        return re.compile("|".join(sources), re.DOTALL) if sources else None
+
+    def __parse_rule(self, line):
+        if line.startswith("#"):
+            return None
+        line = self.__strip_unescaped_trailing_spaces(line)
+        if not line:
+            return None
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+        anchored = "/" in line
+        line = line.lstrip("/")
+        prefix = "" if anchored else "(?:.*/)?"
+        return re.compile(prefix + self.__translate(line), re.DOTALL), negated, directory_only
+
+    @staticmethod
+    def __strip_unescaped_trailing_spaces(line):
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            return stripped[:-1] + " "
+        return stripped
+
+    @staticmethod
+    def __translate(glob):
+        parts = []
+        i = 0
+        while i < len(glob):
+            if glob.startswith("**/", i):
+                parts.append("(?:.*/)?")
+                i += 3
+            elif glob.startswith("**", i) and i + 2 == len(glob):
+                parts.append(".*")
+                i += 2
+            elif glob[i] == "*":
+                parts.append("[^/]*")
+                i += 1
+            elif glob[i] == "?":
+                parts.append("[^/]")
+                i += 1
+            elif glob[i] == "[" and "]" in glob[i + 2:]:
+                end = glob.index("]", i + 2)
+                character_class = glob[i + 1:end].replace("\\", "\\\\")
+                if character_class.startswith("!"):
+                    character_class = "^" + character_class[1:]
+                parts.append(f"[{character_class}]")
+                i = end + 1
+            elif glob[i] == "\\" and i + 1 < len(glob):
+                parts.append(re.escape(glob[i + 1]))
+                i += 2
+            else:
+                parts.append(re.escape(glob[i]))
+                i += 1
+        return "".join(parts)
+
+
+class IgnoreRulesTree:
+    """
+    Loads the ignore files of every directory once, on first use, and matches paths against
+    the rules of their own directory and all of its ancestors up to the base directory, with
+    rules in deeper directories taking precedence.
+    """
+
+    def __init__(self, base_directory_path, ignore_file_names):
+        self.__base_directory_path = os.path.abspath(base_directory_path)
+        self.__ignore_file_names = ignore_file_names
+        self.__chains = {}
+
+    def ignores(self, path, is_directory):
+        path = os.path.abspath(path)
+        for directory_path, rules in self.__chain(os.path.dirname(path)):
+            relative_path = os.path.relpath(path, directory_path).replace(os.sep, "/")
+            matched = rules.match(relative_path, is_directory)
+            if matched is not None:
+                return matched
+        return False
+
+    def __chain(self, directory_path):
+        chain = self.__chains.get(directory_path)
+        if chain is not None:
+            return chain
+        if directory_path == self.__base_directory_path or not directory_path.startswith(self.__base_directory_path + os.sep):
+            parent_chain = ()
+        else:
+            parent_chain = self.__chain(os.path.dirname(directory_path))
+        own_rules = [(directory_path, rules) for rules in self.__load(directory_path)]
+        chain = tuple(reversed(own_rules)) + parent_chain
+        self.__chains[directory_path] = chain
+        return chain
+
+    def __load(self, directory_path):
+        for name in self.__ignore_file_names:
+            rules = IgnoreRules.from_file(os.path.join(directory_path, name))
+            if rules:
+                yield rules
@@ -1,63 +1,117 @@
 class Listing:
+    """
+    A declared listing, holding the lines of its declaration together with the bounds of its
+    content lines, found by moving one index forward past leading blank lines and one index
+    backward past trailing ones. The content is only joined into one string when it is first
+    read, so that listings that are counted or skipped are never copied. The begin and end
+    statements default to 'BEGIN LISTING' and 'END LISTING', but any configured markers can
+    be given instead. Lines are only broken at '\n', '\r' and '\r\n', as in source files.
+    """
     BEGIN_STATEMENT = "BEGIN LISTING"
     END_STATEMENT = "END LISTING"
+    __slots__ = ("__listing_lines", "__begin_statement_line", "__name", "__content_start", "__content_end", "__content", "__line_range")
 
-    def __init__(self, listing_string: str):
+    def __init__(self, listing_string: str, first_line=None, begin_statement=BEGIN_STATEMENT, end_statement=END_STATEMENT):
         self.__validate_input_string(listing_string)
-        self.__listing_lines = listing_string.splitlines()
+        line_range = None if first_line is None else (first_line, first_line + self.count_line_breaks(listing_string))
+        self.__initialize(self.__split_lines(listing_string), line_range, begin_statement, end_statement)
+
+    @classmethod
+    def from_lines(cls, listing_lines: list, first_line=None, begin_statement=BEGIN_STATEMENT, end_statement=END_STATEMENT):
+        """
+        Creates a listing from the lines of its declaration, without their line breaks, as a
+        line-oriented parser collects them, so that they are never joined and split again.
+        The listing takes ownership of the given list.
+        """
+        if not listing_lines:
+            raise ListingError("The listing string cannot be empty")
+        listing = cls.__new__(cls)
+        line_range = None if first_line is None else (first_line, first_line + len(listing_lines) - 1)
+        listing.__initialize(listing_lines, line_range, begin_statement, end_statement)
+        return listing
+
+    def __initialize(self, listing_lines, line_range, begin_statement, end_statement):
+        self.__listing_lines = listing_lines
+        self.__line_range = line_range
         self.__begin_statement_line = self.__listing_lines[0].strip()
-        self.__begin_statement_keywords = self.__begin_statement_line.split()
-        self.__content = self.__extract_content()
-        self.__validate_listing()
+        self.__name = None
+        self.__content_start, self.__content_end = self.__content_bounds()
+        self.__content = None
+        self.__validate_listing(begin_statement, end_statement)
+
+    @staticmethod
+    def __split_lines(listing_string):
+        listing_lines = listing_string.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        if len(listing_lines) > 1 and listing_lines[-1] == "":
+            # A final line break ends the last line rather than starting another one
+            listing_lines.pop()
+        return listing_lines
 
     def __validate_input_string(self, listing_string):
         if not isinstance(listing_string, str):
             raise TypeError("The listing string must be a string")
         if listing_string == "":
             raise ListingError("The listing string cannot be empty")
-        
-    def __extract_content(self):
-        statement_lines_removed = self.__listing_lines[1:-1]
-        content_lines = self.__surrounding_empty_lines_removed(statement_lines_removed)
-        return "\n".join(content_lines)
-    
-    def __surrounding_empty_lines_removed(self, lines):
-        lines_copy = lines[:]
-        # Remove leading empty lines
-        while lines_copy and lines_copy[0].strip() == "":
-            lines_copy = lines_copy[1:]
-        # Remove trailing empty lines
-        while lines_copy and lines_copy[-1].strip() == "":
-            lines_copy = lines_copy[:-1]
-        return lines_copy
+
+    def __content_bounds(self):
+        # The statement lines are excluded, as are the surrounding empty lines
+        start = 1
+        end = len(self.__listing_lines) - 1
+        while start < end and self.__is_empty(self.__listing_lines[start]):
+            start += 1
+        while end > start and self.__is_empty(self.__listing_lines[end - 1]):
+            end -= 1
+        return start, max(start, end)
+
+    @staticmethod
+    def __is_empty(line):
+        return not line or line.isspace()
     
-    def __validate_listing(self):
-        self.__validate_statement_lines()
+    def __validate_listing(self, begin_statement, end_statement):
+        self.__validate_statement_lines(begin_statement, end_statement)
         self.__validate_content()
 
-    def __validate_statement_lines(self):
-        if not len(self.__begin_statement_keywords) == 3:
-            self.__raise_begin_statement_format_error()
-        if not self.__begin_statement_line.startswith(self.BEGIN_STATEMENT):
-            self.__raise_begin_statement_format_error()
+    def __validate_statement_lines(self, begin_statement, end_statement):
+        if not self.__begin_statement_line.startswith(begin_statement):
+            self.__raise_begin_statement_format_error(begin_statement)
+        arguments = self.__begin_statement_line[len(begin_statement):]
+        keywords = arguments.split()
+        if not arguments[:1].isspace() or len(keywords) != 1:
+            self.__raise_begin_statement_format_error(begin_statement)
+        self.__name = keywords[0]
         end_line = self.__listing_lines[-1].strip()
-        if not end_line.endswith(self.END_STATEMENT):
-            raise ListingError(f"The end statement line '{end_line}' should end with '{self.END_STATEMENT}'")
+        if not end_line.endswith(end_statement):
+            raise ListingError(f"The end statement line '{end_line}' should end with '{end_statement}'")
 
-    def __raise_begin_statement_format_error(self):
-        raise ListingError(f"The begin statement '{self.__begin_statement_line}' should be in the format '{self.BEGIN_STATEMENT} <name>' (e.g., 'BEGIN LISTING my_snippet')")
+    def __raise_begin_statement_format_error(self, begin_statement):
+        raise ListingError(f"The begin statement '{self.__begin_statement_line}' should be in the format '{begin_statement} <name>' (e.g., '{begin_statement} my_snippet')")
 
     def __validate_content(self):
-        if self.__content == "":
+        if self.__content_start == self.__content_end:
             raise ListingError(f"The listing content cannot be empty")
 
     @property
     def name(self):
-        return self.__begin_statement_keywords[2]
+        return self.__name
 
     @property
     def content(self):
+        if self.__content is None:
+            self.__content = "\n".join(self.__listing_lines[self.__content_start:self.__content_end])
         return self.__content
+
+    @property
+    def line_range(self):
+        """
+        The numbers of the lines holding the begin and end statements in the source file,
+        counting from 1, or None if the position of the listing is unknown.
+        """
+        return self.__line_range
+
+    @staticmethod
+    def count_line_breaks(string):
+        # Counts line breaks the way they are read from source files, where '\r\n' is one break
+        return string.count("\n") + string.count("\r") - string.count("\r\n")
     
 
 class ListingError(Exception):
@@ -0,0 +1,109 @@
+import os
+import json
+import struct
+from listloc.extractor.listing_writer import ListingWriter
+
+
+class ListingBundle:
+    """
+    A single file holding every extracted listing. The file starts with a magic line and the
+    length of a JSON index, followed by the index and the concatenated UTF-8 listing
+    contents. The index maps each listing key, the listing name prefixed with the directory
+    of its source file relative to the base directory, to the offset and length of its
+    content in the payload, so that one listing can be read without reading the others.
+    """
+    MAGIC = b"LISTLOC-BUNDLE 1\n"
+    __INDEX_LENGTH = struct.Struct("<Q")
+
+    def __init__(self, bundle_path):
+        self.__bundle_path = bundle_path
+        with open(bundle_path, "rb") as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise BundleError(f"'{bundle_path}' is not a listing bundle")
+            (index_length,) = self.__INDEX_LENGTH.unpack(f.read(self.__INDEX_LENGTH.size))
+            index = json.loads(f.read(index_length).decode("utf-8"))
+        self.__entries = {entry["key"]: entry for entry in index}
+        self.__payload_offset = len(self.MAGIC) + self.__INDEX_LENGTH.size + index_length
+
+    @staticmethod
+    def key(relative_source_directory_path, listing_name):
+        if relative_source_directory_path in ("", os.curdir):
+            return listing_name
+        return f"{relative_source_directory_path.replace(os.sep, '/')}/{listing_name}"
+
+    @classmethod
+    def encode(cls, entries):
+        """
+        Encodes (key, source_path, content) entries, in the given order, into bundle bytes.
+        """
+        index = []
+        payloads = []
+        offset = 0
+        for key, source_path, content in entries:
+            payload = content.encode("utf-8")
+            index.append({"key": key, "source": source_path.replace(os.sep, "/"), "offset": offset, "length": len(payload)})
+            payloads.append(payload)
+            offset += len(payload)
+        index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        return b"".join([cls.MAGIC, cls.__INDEX_LENGTH.pack(len(index_bytes)), index_bytes, *payloads])
+
+    @classmethod
+    def write(cls, bundle_path, entries, listing_writer: ListingWriter):
+        """
+        Writes the bundle in one sequential write, unless the existing bundle is identical.
+        Returns whether the bundle file was written.
+        """
+        bundle_bytes = cls.encode(entries)
+        try:
+            if os.stat(bundle_path).st_size == len(bundle_bytes):
+                with open(bundle_path, "rb") as f:
+                    if f.read() == bundle_bytes:
+                        return False
+        except FileNotFoundError:
+            pass
+        listing_writer.write(bundle_path, bundle_bytes)
+        return True
+
+    def keys(self):
+        return list(self.__entries)
+
+    def find(self, name):
+        """
+        Returns the key of the listing with the given key, or with the given name if exactly
+        one listing has that name.
+        """
+        keys = self.keys()
+        if name in keys:
+            return name
+        matching_keys = [key for key in keys if key.rsplit("/", 1)[-1] == name]
+        if not matching_keys:
+            raise BundleError(f"No listing named '{name}' in '{self.__bundle_path}'")
+        if len(matching_keys) > 1:
+            raise BundleError(f"The listing name '{name}' is ambiguous, use one of: {', '.join(matching_keys)}")
+        return matching_keys[0]
+
+    def read(self, key):
+        entry = self.__entries[key]
+        with open(self.__bundle_path, "rb") as f:
+            f.seek(self.__payload_offset + entry["offset"])
+            return f.read(entry["length"]).decode("utf-8")
+
+    def to_latex(self):
+        """
+        Returns LaTeX source that writes every listing to its own file when compiled, using
+        'filecontents*' environments. The file of a listing is named after its key with each
+        '/' replaced by '-', e.g. 'docs-greet.listing'.
+        """
+        environments = []
+        for key in self.keys():
+            content = self.read(key)
+            if "\\end{filecontents*}" in content:
+                raise BundleError(f"The listing '{key}' cannot be exported to LaTeX because it contains '\\end{{filecontents*}}'")
+            environments.append(f"\\begin{{filecontents*}}[overwrite]{{{key.replace('/', '-')}.listing}}\n{content}\n\\end{{filecontents*}}\n")
+        return "".join(environments)
+
+
+class BundleError(Exception):
+
+    def __init__(self, message):
+        super().__init__(message)
@@ -1,3 +1,15 @@
 class ListingConstants:
     LISTING_DIRECTORY_NAME = "listings"
-    LISTING_FILE_EXTENSION = ".listing"
\ No newline at end of file
+    LISTING_FILE_EXTENSION = ".listing"
+    CACHE_FILE_NAME = ".listloc-cache"
+    CACHE_TEMPORARY_FILE_NAME = ".listloc-cache.tmp"
+    BUNDLE_FILE_NAME = "listings.bundle"
+    INDEX_FILE_NAME = "index.json"
+    PYPROJECT_FILE_NAME = "pyproject.toml"
+    IGNORE_FILE_NAMES = (".gitignore", ".listlocignore")
+    DEFAULT_EXCLUDED_DIRECTORY_NAMES = frozenset({
+        LISTING_DIRECTORY_NAME,
+        ".git", ".hg", ".svn", ".bzr",
+        "node_modules", ".venv", "venv", "__pycache__",
+        ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    })
@@ -1,69 +1,311 @@
 import os
+from enum import Enum
+from contextlib import nullcontext
+from collections import deque
 from listloc.extractor.file_extractor import FileExtractor
 from listloc.extractor.action_logger import ActionLogger
+from listloc.extractor.scan_manifest import ScanManifest
+from listloc.extractor.source_scanner import SourceScanner
+from listloc.extractor.path_filter import PathFilter
+from listloc.extractor.tree_walker import TreeWalker, ListingDirectory
+from listloc.extractor.listing_writer import ListingWriter
+from listloc.extractor.listing_bundle import ListingBundle
 from listloc.extractor.listing_constants import ListingConstants
+from listloc.extractor.extraction_stats import ExtractionStats
+from listloc.extractor.listing_index import ListingIndex
+from listloc.extractor.parse_cache import ParseCache
+from listloc.extractor.listing_syntax import ListingSyntax
+
+
+class ExtractionEngine(str, Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+    ASYNC = "async"
+
+
+class OutputFormat(str, Enum):
+    FILES = "files"
+    BUNDLE = "bundle"
 
 
 class ListingExtractor:
+    __PENDING_SCANS_PER_JOB = 4
 
-    def __init__(self, base_directory_path, action_logger: ActionLogger):
+    def __init__(self, base_directory_path, action_logger: ActionLogger, use_cache=True, jobs=1, engine=ExtractionEngine.THREAD, exclude_patterns=(), use_ignore_files=True, durable=False, output_format=OutputFormat.FILES, stats: ExtractionStats = None, write_index=False, parse_cache_size=ParseCache.DEFAULT_MAX_BYTES, syntax: ListingSyntax = None):
         self.__validate_directory_path(base_directory_path)
         self.__base_directory_path = base_directory_path
         self.__logger = action_logger
+        self.__use_cache = use_cache
+        self.__jobs = jobs
+        self.__engine = ExtractionEngine(engine)
+        self.__listing_writer = ListingWriter(durable)
+        self.__output_format = OutputFormat(output_format)
+        self.__tree_walker = TreeWalker(base_directory_path, PathFilter(base_directory_path, exclude_patterns, use_ignore_files))
+        self.__stats = stats
+        self.__write_index = write_index
+        self.__parse_cache_size = parse_cache_size
+        self.__syntax = syntax or ListingSyntax.default()
 
     def __validate_directory_path(self, path):
         if not os.path.isdir(path):
             raise NotADirectoryError(f"Expected a directory path, but got: '{path}'")
 
-    def extract_all_listings(self):
-        file_paths = self.__all_file_paths()
+    def extract_all_listings(self, prune=False):
+        """
+        Extracts the listings of every source file under the base directory. With prune, every
+        listing file that no source file produced is deleted once the extraction is complete,
+        while the listing files that are still produced are never touched. The tree is walked
+        once, with the listing directories to prune collected on the way.
+
+        In the bundle output format, all listings are written to one bundle file in the base
+        directory instead, which always holds exactly the listings currently declared.
+
+        With write_index, an 'index.json' file in every listing directory maps each listing
+        to its source file, line range and content hash. The indexes are updated together
+        with the listing files, and their entries of skipped source files are kept. Without
+        write_index, the indexes that already exist are still updated, so that they never
+        describe listings that are gone.
+
+        Copies of a source file are only parsed once per run, using a parse cache of up to
+        parse_cache_size bytes. The process pool does not use it, since its workers do not
+        share memory.
+
+        Listings are declared with the markers of the given syntax, which is compiled once
+        and shared by every scan of the run.
+
+        If stats are given, the time of each phase and the counts of processed files and
+        listings are collected in them.
+        """
+        if self.__output_format == OutputFormat.BUNDLE:
+            self.__extract_bundle()
+            return
+        listing_directories = [] if prune else None
+        self.__extract(self.__walk(listing_directories), listing_directories)
+
+    def extract_listings(self, paths, prune=False):
+        """
+        Extracts the listings of the given source files and of every source file under the
+        given directories, without walking the rest of the base directory. The paths must lie
+        within the base directory, whose scan manifest and ignore rules apply to them, and
+        excluded paths are skipped as in a walk. A given file that no longer exists counts as
+        a deleted source file, whose listings are removed.
+
+        Listings of vanished source files are only removed within the given paths, and prune
+        is scoped in the same way: it prunes the listing directories under the given
+        directories and those next to the given files, whose sibling source files are then
+        also scanned, so that the listings they produce are kept.
+        """
+        if self.__output_format == OutputFormat.BUNDLE:
+            raise ValueError("The bundle output format holds the listings of the whole base directory and cannot be used with individual paths")
+        directory_paths, file_paths, missing_paths = self.__classify_paths(paths)
+        listing_directories = [] if prune else None
+        parent_directory_paths = set()
+        if prune:
+            parent_directory_paths = {os.path.dirname(path) for path in file_paths + missing_paths if not self.__lies_within(path, directory_paths)}
+            parent_directory_paths = {path for path in parent_directory_paths if not self.__tree_walker.excludes(path, True)}
+            for parent_directory_path in sorted(parent_directory_paths):
+                listing_directory = self.__tree_walker.listing_directory(parent_directory_path)
+                if listing_directory is not None:
+                    listing_directories.append(listing_directory)
+                file_paths.extend(self.__tree_walker.directory_source_file_paths(parent_directory_path))
+        source_file_paths = self.__source_file_paths(directory_paths, file_paths, listing_directories)
+        if self.__stats is not None:
+            source_file_paths = self.__stats.timed_iteration("walk", source_file_paths)
+        scope_paths = directory_paths + missing_paths
+        self.__extract(source_file_paths, listing_directories, lambda path: self.__lies_within(path, scope_paths) or os.path.dirname(path) in parent_directory_paths)
+
+    def __classify_paths(self, paths):
+        """
+        Splits the given paths into directories, files and missing paths, each in the form a
+        walk of the base directory yields them, leaving out excluded paths and duplicates.
+        """
+        directory_paths, file_paths, missing_paths = [], [], []
+        seen_paths = set()
+        for path in paths:
+            relative_path = os.path.relpath(path, self.__base_directory_path)
+            if relative_path == os.pardir or relative_path.startswith(os.pardir + os.sep):
+                raise ValueError(f"Expected a path within '{self.__base_directory_path}', but got: '{path}'")
+            path = os.path.join(self.__base_directory_path, relative_path) if relative_path != os.curdir else self.__base_directory_path
+            if path in seen_paths:
+                continue
+            seen_paths.add(path)
+            if os.path.isdir(path):
+                if not self.__tree_walker.excludes(path, True):
+                    directory_paths.append(path)
+            elif not os.path.lexists(path):
+                missing_paths.append(path)
+            elif not self.__tree_walker.excludes(path, False):
+                file_paths.append(path)
+        return directory_paths, file_paths, missing_paths
+
+    @staticmethod
+    def __lies_within(path, directory_paths):
+        return any(path == directory_path or path.startswith(os.path.join(directory_path, "")) for directory_path in directory_paths)
+
+    def __source_file_paths(self, directory_paths, file_paths, listing_directories):
+        seen_paths = set()
+        for directory_path in directory_paths:
+            for path in self.__tree_walker.source_file_paths(directory_path, listing_directories):
+                if path not in seen_paths:
+                    seen_paths.add(path)
+                    yield path
         for path in file_paths:
-            file_extractor = FileExtractor(path, self.__logger)
-            file_extractor.extract_listings()
-    
-    def __all_file_paths(self):
-        file_paths = []
-        for root, dirs, files in os.walk(self.__base_directory_path):
-            for file in files:
-                file_paths.append(os.path.join(root, file))
-        return file_paths
+            if path not in seen_paths:
+                seen_paths.add(path)
+                yield path
+
+    def __extract(self, source_file_paths, listing_directories, in_scope=None):
+        """
+        Extracts the listings of the given source files, then removes the listings of vanished
+        source files for which in_scope holds, or of all of them if it is None. If a list of
+        listing directories is given, they are pruned once it is filled.
+        """
+        manifest = ScanManifest(self.__base_directory_path, self.__syntax.fingerprint) if self.__use_cache else None
+        listing_index = ListingIndex(self.__logger, self.__listing_writer, existing_only=not self.__write_index)
+        parse_cache = self.__create_parse_cache()
+        # Stale listings are deleted once every scan is applied, since another source file may still produce them
+        stale_listing_file_paths = set()
+        file_extractors = (FileExtractor(path, self.__logger, manifest, self.__listing_writer, self.__stats, listing_index, parse_cache, self.__syntax, stale_listing_file_paths) for path in source_file_paths if not self.__syntax.is_configuration_file(path))
+        extracted_listing_file_paths = set()
+
+        def apply_scan(file_extractor, source_scan):
+            with self.__phase("write"):
+                extracted_listing_file_paths.update(file_extractor.apply_scan(source_scan))
+
+        try:
+            self.__process_scans(file_extractors, apply_scan)
+        finally:
+            # Durable writes are only moved into place by a flush, also when a scan failed
+            with self.__phase("write"):
+                self.__listing_writer.flush()
+        if manifest is not None:
+            with self.__phase("prune"):
+                self.__remove_listings_of_vanished_sources(manifest, listing_index, stale_listing_file_paths, in_scope)
+                FileExtractor.delete_stale_listing_files(stale_listing_file_paths, self.__logger, manifest, extracted_listing_file_paths)
+            manifest.save()
+        if listing_directories is not None:
+            with self.__phase("prune"):
+                for listing_directory in listing_directories:
+                    self.__clear_directory(listing_directory, extracted_listing_file_paths, listing_index)
+        with self.__phase("write"):
+            listing_index.save()
+            self.__listing_writer.flush()
+
+    def __create_parse_cache(self):
+        if self.__parse_cache_size <= 0 or (self.__engine == ExtractionEngine.PROCESS and self.__jobs > 1):
+            return None
+        return ParseCache(self.__parse_cache_size)
+
+    def __walk(self, listing_directories=None):
+        source_file_paths = self.__tree_walker.source_file_paths(listing_directories=listing_directories)
+        if self.__stats is None:
+            return source_file_paths
+        return self.__stats.timed_iteration("walk", source_file_paths)
+
+    def __phase(self, name):
+        return self.__stats.phase(name) if self.__stats is not None else nullcontext()
+
+    def __extract_bundle(self):
+        # Every source file is scanned, since skipping unchanged ones would need their listings from the previous bundle
+        parse_cache = self.__create_parse_cache()
+        file_extractors = (FileExtractor(path, self.__logger, stats=self.__stats, parse_cache=parse_cache, syntax=self.__syntax) for path in self.__walk() if not self.__syntax.is_configuration_file(path))
+        entries = []
+
+        def collect_listings(file_extractor, source_scan):
+            relative_source_file_path = os.path.relpath(file_extractor.source_file_path, self.__base_directory_path)
+            for listing in file_extractor.collect_listings(source_scan):
+                key = ListingBundle.key(os.path.dirname(relative_source_file_path), listing.name)
+                entries.append((key, relative_source_file_path, listing.content))
+
+        self.__process_scans(file_extractors, collect_listings)
+        bundle_path = os.path.join(self.__base_directory_path, ListingConstants.BUNDLE_FILE_NAME)
+        if entries:
+            with self.__phase("write"):
+                written = ListingBundle.write(bundle_path, entries, self.__listing_writer)
+                self.__listing_writer.flush()
+            self.__logger.log_bundle(bundle_path, len(entries), written)
+        else:
+            self.__delete_listing_file(bundle_path)
+
+    def __process_scans(self, file_extractors, process):
+        """
+        Scans the source file of each file extractor and calls process with the file extractor
+        and its scan, in walk order. With the async engine, the walk, the scans and the
+        processing overlap in an asyncio pipeline, with up to the given number of jobs
+        reading source files at a time.
+        """
+        def record_and_process(file_extractor, source_scan):
+            if self.__stats is not None:
+                self.__stats.record_scan(source_scan)
+            process(file_extractor, source_scan)
+
+        if self.__engine == ExtractionEngine.ASYNC:
+            # Imported here because asyncio is only needed by the async engine
+            from listloc.extractor.async_pipeline import AsyncExtractionPipeline
+            AsyncExtractionPipeline(self.__jobs, self.__jobs * self.__PENDING_SCANS_PER_JOB).run(file_extractors, record_and_process)
+            return
+        for file_extractor, source_scan in self.__scan_all(file_extractors):
+            record_and_process(file_extractor, source_scan)
+
+    def __scan_all(self, file_extractors):
+        """
+        Yields each file extractor together with the scan of its source file, in walk order.
+        With more than one job, a bounded window of scans runs ahead on a worker pool while the
+        results are still applied one by one in walk order, so the logged actions, summaries
+        and errors are identical to a serial run.
+        """
+        if self.__jobs <= 1:
+            for file_extractor in file_extractors:
+                yield file_extractor, file_extractor.scanner().scan()
+            return
+        # Imported here because the process pool pulls in multiprocessing, which serial runs never need
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+        executor_type = ProcessPoolExecutor if self.__engine == ExtractionEngine.PROCESS else ThreadPoolExecutor
+        executor = executor_type(max_workers=self.__jobs)
+        pending_scans = deque()
+        try:
+            for file_extractor in file_extractors:
+                pending_scans.append((file_extractor, executor.submit(SourceScanner.scan, file_extractor.scanner())))
+                if len(pending_scans) >= self.__jobs * self.__PENDING_SCANS_PER_JOB:
+                    file_extractor, future = pending_scans.popleft()
+                    yield file_extractor, future.result()
+            while pending_scans:
+                file_extractor, future = pending_scans.popleft()
+                yield file_extractor, future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def __remove_listings_of_vanished_sources(self, manifest, listing_index, stale_listing_file_paths, in_scope=None):
+        for path in manifest.unseen_source_paths():
+            if in_scope is not None and not in_scope(path):
+                continue
+            FileExtractor(path, self.__logger, manifest, listing_index=listing_index, stale_listing_file_paths=stale_listing_file_paths).remove_extracted_listings()
     
     def clear_all_listing_extractions(self):
-        directory_paths = self.__all_directory_paths()
-        for directory in directory_paths:
-            self.__clear_directory(directory)
-
-    def __all_directory_paths(self):
-        directory_paths = []
-        for root, dirs, files in os.walk(self.__base_directory_path):
-            for dir in dirs:
-                directory_paths.append(os.path.join(root, dir))
-        return directory_paths
+        ScanManifest.discard(self.__base_directory_path)
+        self.__delete_listing_file(os.path.join(self.__base_directory_path, ListingConstants.BUNDLE_FILE_NAME))
+        for listing_directory in self.__tree_walker.listing_directories():
+            self.__delete_listing_file(ListingIndex.index_file_path(listing_directory.path))
+            self.__clear_directory(listing_directory)
     
-    def __clear_directory(self, directory_path):
-        if not self.__is_listing_directory(directory_path):
+    def __clear_directory(self, listing_directory: ListingDirectory, listing_file_paths_to_keep=frozenset(), listing_index: ListingIndex = None):
+        for file_path in listing_directory.listing_file_paths:
+            if file_path not in listing_file_paths_to_keep:
+                self.__delete_listing_file(file_path)
+                if listing_index is not None:
+                    listing_index.forget_listing(file_path)
+        self.__remove_directory_if_empty(listing_directory.path)
+
+    def __delete_listing_file(self, file_path):
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
             return
-        self.__delete_listing_files_in(directory_path)
-        if self.__directory_is_empty(directory_path):
-            os.rmdir(directory_path)
-            self.__logger.log_removed_directory(directory_path)
-    
-    def __is_listing_directory(self, directory_path):
-        directory_name = os.path.basename(directory_path)
-        return directory_name == ListingConstants.LISTING_DIRECTORY_NAME
-    
-    def __directory_is_empty(self, directory_path):
-        return len(os.listdir(directory_path)) == 0
-    
-    def __delete_listing_files_in(self, directory_path):
-        for file in self.__files_in_directory(directory_path):
-            if self.__is_listing_file(file):
-                file_path = os.path.join(directory_path, file)
-                os.remove(file_path)
-                self.__logger.log_deleted_file(file_path)
-    
-    def __files_in_directory(self, directory_path):
-        return os.listdir(directory_path)
+        self.__logger.log_deleted_file(file_path)
 
-    def __is_listing_file(self, file):
-        return file.endswith(ListingConstants.LISTING_FILE_EXTENSION)
+    def __remove_directory_if_empty(self, directory_path):
+        try:
+            os.rmdir(directory_path)
+        except OSError:
+            return
+        self.__logger.log_removed_directory(directory_path)
@@ -0,0 +1,146 @@
+import os
+import json
+import hashlib
+from listloc.extractor.listing_constants import ListingConstants
+from listloc.extractor.action_logger import ActionLogger
+from listloc.extractor.listing_writer import ListingWriter
+
+
+class ListingIndex:
+    """
+    The 'index.json' files of the 'listings/' directories. Each index maps the name of every
+    listing in its directory to the name of its source file, the line range of its
+    declaration and the hash of its content, so that build tools can depend on exactly the
+    listings a document uses. Indexes are loaded when first touched, updated per source file
+    and only written on save if their content changed. With existing_only, only the indexes
+    that already exist are kept up to date, and no new ones are created.
+    """
+    VERSION = 1
+
+    def __init__(self, action_logger: ActionLogger, listing_writer: ListingWriter = None, existing_only=False):
+        self.__logger = action_logger
+        self.__listing_writer = listing_writer or ListingWriter()
+        self.__existing_only = existing_only
+        self.__entries_by_directory = {}
+        self.__changed_directory_paths = set()
+
+    @staticmethod
+    def index_file_path(listing_directory_path):
+        return os.path.join(listing_directory_path, ListingConstants.INDEX_FILE_NAME)
+
+    @staticmethod
+    def digest(content):
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def indexes(self, source_file_path):
+        """
+        Returns whether the listings of the given source file are kept in an index, and so
+        need the line ranges of their declarations.
+        """
+        return self.__entries(self.__listing_directory_path(source_file_path)) is not None
+
+    def covers(self, source_file_path, listing_names):
+        """
+        Returns whether the index holds an entry from the given source file for every name.
+        """
+        entries = self.__entries(self.__listing_directory_path(source_file_path))
+        if entries is None:
+            return True
+        source_file_name = os.path.basename(source_file_path)
+        return all(name in entries and entries[name]["source"] == source_file_name for name in listing_names)
+
+    def record(self, source_file_path, listings):
+        listing_directory_path = self.__listing_directory_path(source_file_path)
+        entries = self.__entries(listing_directory_path)
+        if entries is None:
+            return
+        updated_entries = {name: entry for name, entry in entries.items() if entry["source"] != os.path.basename(source_file_path)}
+        for listing in listings:
+            updated_entries[listing.name] = self.__entry(source_file_path, listing)
+        self.__update(listing_directory_path, updated_entries)
+
+    def forget_source(self, source_file_path):
+        self.record(source_file_path, [])
+
+    def forget_listing(self, listing_file_path):
+        listing_directory_path = os.path.dirname(listing_file_path)
+        name = os.path.basename(listing_file_path)[:-len(ListingConstants.LISTING_FILE_EXTENSION)]
+        entries = self.__entries(listing_directory_path)
+        if entries is not None and name in entries:
+            self.__update(listing_directory_path, {key: entry for key, entry in entries.items() if key != name})
+
+    def save(self):
+        """
+        Writes every changed index, deleting the indexes left without entries together with
+        their listing directory if it is then empty.
+        """
+        for listing_directory_path in sorted(self.__changed_directory_paths):
+            entries = self.__entries_by_directory[listing_directory_path]
+            if entries:
+                self.__write(listing_directory_path, entries)
+            else:
+                self.__delete(listing_directory_path)
+        self.__changed_directory_paths.clear()
+
+    def __listing_directory_path(self, source_file_path):
+        return os.path.join(os.path.dirname(source_file_path), ListingConstants.LISTING_DIRECTORY_NAME)
+
+    def __entry(self, source_file_path, listing):
+        first_line, last_line = listing.line_range
+        return {
+            "source": os.path.basename(source_file_path),
+            "first_line": first_line,
+            "last_line": last_line,
+            "sha256": self.digest(listing.content),
+        }
+
+    def __entries(self, listing_directory_path):
+        """
+        Returns the entries of the index of the given listing directory, or None if the
+        directory has no index and none is created.
+        """
+        if listing_directory_path not in self.__entries_by_directory:
+            if self.__existing_only and not os.path.isfile(self.index_file_path(listing_directory_path)):
+                self.__entries_by_directory[listing_directory_path] = None
+                return None
+            self.__entries_by_directory[listing_directory_path] = self.__load(listing_directory_path)
+        return self.__entries_by_directory[listing_directory_path]
+
+    def __load(self, listing_directory_path):
+        try:
+            with open(self.index_file_path(listing_directory_path), "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        return data.get("listings", {})
+
+    def __update(self, listing_directory_path, entries):
+        if entries != self.__entries_by_directory[listing_directory_path]:
+            self.__entries_by_directory[listing_directory_path] = entries
+            self.__changed_directory_paths.add(listing_directory_path)
+
+    def __write(self, listing_directory_path, entries):
+        data = {"version": self.VERSION, "listings": entries}
+        content_bytes = (json.dumps(data, indent=2, sort_keys=True) + "\n").encode("utf-8")
+        index_file_path = self.index_file_path(listing_directory_path)
+        existed = os.path.isfile(index_file_path)
+        self.__listing_writer.write(index_file_path, content_bytes)
+        if existed:
+            self.__logger.log_updated_file(index_file_path)
+        else:
+            self.__logger.log_written_file(index_file_path)
+
+    def __delete(self, listing_directory_path):
+        index_file_path = self.index_file_path(listing_directory_path)
+        try:
+            os.remove(index_file_path)
+        except FileNotFoundError:
+            return
+        self.__logger.log_deleted_file(index_file_path)
+        try:
+            os.rmdir(listing_directory_path)
+        except OSError:
+            return
+        self.__logger.log_removed_directory(listing_directory_path)
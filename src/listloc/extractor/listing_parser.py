@@ -0,0 +1,77 @@
+import time
+from listloc.extractor.listing import Listing
+from listloc.extractor.listing_syntax import ListingSyntax
+
+
+class ListingParser:
+    """
+    Line-oriented state machine that collects listings while the lines of a source file are
+    fed to it one at a time. Only the lines of the listing currently being collected are kept
+    in memory. A listing starts at the first begin marker of the syntax outside of a listing
+    and ends at the next end marker paired with it, even if either statement is preceded by
+    other text on its line. If the syntax restricts the source file to comment lines, lines
+    that are not comments never hold statements.
+    If a dict of phase times is given, the time spent constructing listings is added to it.
+    Lines are numbered from first_line_number, the number of the first line fed.
+    """
+
+    def __init__(self, source_file_path, phase_times=None, first_line_number=1, syntax: ListingSyntax = None):
+        self.__source_file_path = source_file_path
+        self.__phase_times = phase_times
+        self.__syntax = syntax or ListingSyntax.default()
+        self.__comment_prefixes = self.__syntax.comment_prefixes(source_file_path)
+        self.__listings = []
+        self.__listing_lines = None
+        self.__line_number = first_line_number - 1
+        self.__begin_line_number = None
+        self.__begin_marker = None
+        self.__end_marker = None
+
+    def feed_line(self, line):
+        self.__line_number += 1
+        if self.__comment_prefixes is not None and not line.lstrip().startswith(self.__comment_prefixes):
+            if self.__listing_lines is not None:
+                self.__listing_lines.append(line)
+            return
+        if self.__listing_lines is not None:
+            line = self.__find_end_statement(line)
+        while line:
+            line = self.__find_begin_statement(line)
+            if line:
+                line = self.__find_end_statement(line)
+
+    def __find_begin_statement(self, line):
+        begin_index, begin_marker = self.__syntax.find_begin(line)
+        if begin_index == -1:
+            return ""
+        self.__begin_marker = begin_marker
+        self.__end_marker = self.__syntax.end_marker(begin_marker)
+        self.__listing_lines = []
+        self.__begin_line_number = self.__line_number
+        # The begin statement line may also hold the end statement
+        return line[begin_index:]
+
+    def __find_end_statement(self, line):
+        end_index = line.find(self.__end_marker, len(self.__begin_marker) if not self.__listing_lines else 0)
+        if end_index == -1:
+            self.__listing_lines.append(line)
+            return ""
+        end_of_statement = end_index + len(self.__end_marker)
+        self.__listing_lines.append(line[:end_of_statement])
+        self.__construct_listing(self.__listing_lines)
+        self.__listing_lines = None
+        return line[end_of_statement:]
+
+    def __construct_listing(self, listing_lines):
+        start = time.perf_counter() if self.__phase_times is not None else None
+        try:
+            self.__listings.append(Listing.from_lines(listing_lines, self.__begin_line_number, self.__begin_marker, self.__end_marker))
+        except Exception as e:
+            raise type(e)(f"In file '{self.__source_file_path}': {e}") from e
+        finally:
+            if start is not None:
+                self.__phase_times["listing_construction"] = self.__phase_times.get("listing_construction", 0.0) + time.perf_counter() - start
+
+    @property
+    def listings(self):
+        return self.__listings
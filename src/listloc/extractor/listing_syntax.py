@@ -0,0 +1,144 @@
+import os
+import re
+import json
+import hashlib
+from listloc.extractor.listing import Listing
+from listloc.extractor.listing_constants import ListingConstants
+
+
+class ListingSyntax:
+    """
+    The marker pairs that begin and end listings, together with the rules that restrict the
+    statements of source files with certain extensions to comment lines, which are lines that
+    start with one of the comment prefixes of their extension after any indentation.
+
+    The syntax is compiled once per run. Begin markers that share a prefix are searched for
+    with one compiled pattern, which scans for their prefix in a single pass. Otherwise each
+    begin marker is searched for with a plain substring search, which is much faster than a
+    pattern, so scanning takes longer with each marker that shares no prefix with the others.
+    The end marker searched for is always the one paired with the begin marker that was found.
+    A 'pyproject.toml' file that configures markers is never scanned itself, since it holds
+    the markers without any listings.
+    """
+    DEFAULT_MARKERS = ((Listing.BEGIN_STATEMENT, Listing.END_STATEMENT),)
+    __default = None
+
+    def __init__(self, markers=DEFAULT_MARKERS, comment_prefixes=None, configuration_path=None):
+        self.__configuration_path = os.path.abspath(configuration_path) if configuration_path is not None else None
+        self.__markers = tuple((begin_marker, end_marker) for begin_marker, end_marker in markers)
+        self.__comment_prefixes = {self.__normalize_extension(extension): self.__to_tuple(prefixes) for extension, prefixes in (comment_prefixes or {}).items()}
+        self.__validate()
+        self.__end_markers = {}
+        for begin_marker, end_marker in self.__markers:
+            self.__end_markers[begin_marker] = end_marker
+            self.__end_markers[begin_marker.encode("utf-8")] = end_marker.encode("utf-8")
+        # The longest marker comes first, so that it wins over any marker that is its prefix
+        begin_markers = sorted((begin_marker for begin_marker, end_marker in self.__markers), key=len, reverse=True)
+        self.__begin_markers = tuple(begin_markers)
+        self.__begin_markers_bytes = tuple(begin_marker.encode("utf-8") for begin_marker in begin_markers)
+        if len(begin_markers) > 1 and os.path.commonprefix(begin_markers):
+            self.__begin_pattern = re.compile("|".join(map(re.escape, begin_markers)))
+            self.__begin_bytes_pattern = re.compile(b"|".join(map(re.escape, self.__begin_markers_bytes)))
+        else:
+            self.__begin_pattern = self.__begin_bytes_pattern = None
+
+    @classmethod
+    def default(cls):
+        if cls.__default is None:
+            cls.__default = cls()
+        return cls.__default
+
+    @classmethod
+    def from_pyproject(cls, directory_path, markers=(), comment_prefixes=None):
+        """
+        Returns the syntax configured in the '[tool.listloc]' table of the 'pyproject.toml'
+        file in the given directory, if there is one. The given markers replace the configured
+        ones, and the given comment prefixes replace those configured for their extensions.
+        """
+        pyproject_path = os.path.join(directory_path, ListingConstants.PYPROJECT_FILE_NAME)
+        configuration = cls.__load_configuration(pyproject_path)
+        configured_markers = [(marker.get("begin"), marker.get("end")) if isinstance(marker, dict) else (None, None) for marker in configuration.get("markers", [])]
+        configured_comment_prefixes = dict(configuration.get("comment-prefixes", {}))
+        configured_comment_prefixes.update(comment_prefixes or {})
+        return cls(list(markers) or configured_markers or cls.DEFAULT_MARKERS, configured_comment_prefixes, pyproject_path if configured_markers else None)
+
+    @staticmethod
+    def __load_configuration(pyproject_path):
+        try:
+            with open(pyproject_path, "rb") as f:
+                # Imported here because TOML is only parsed in directories with a pyproject.toml file
+                import tomllib
+                data = tomllib.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            raise ValueError(f"In file '{pyproject_path}': {e}") from e
+        configuration = data.get("tool", {}).get("listloc", {})
+        if not isinstance(configuration, dict):
+            raise ValueError(f"In file '{pyproject_path}': [tool.listloc] should be a table")
+        return configuration
+
+    @staticmethod
+    def __normalize_extension(extension):
+        return extension if extension.startswith(".") else "." + extension
+
+    @staticmethod
+    def __to_tuple(prefixes):
+        return (prefixes,) if isinstance(prefixes, str) else tuple(prefixes)
+
+    def __validate(self):
+        if not self.__markers:
+            raise ValueError("At least one pair of begin and end markers is required")
+        for begin_marker, end_marker in self.__markers:
+            for marker in (begin_marker, end_marker):
+                if not isinstance(marker, str) or not marker.strip() or marker != marker.strip() or "\n" in marker or "\r" in marker:
+                    raise ValueError(f"Each marker should be a non-empty string on one line without surrounding whitespace, but got: {marker!r}")
+        begin_markers = [begin_marker for begin_marker, end_marker in self.__markers]
+        if len(set(begin_markers)) != len(begin_markers):
+            raise ValueError(f"Each begin marker should only be paired with one end marker, but got: {begin_markers}")
+        for extension, prefixes in self.__comment_prefixes.items():
+            if not prefixes or not all(isinstance(prefix, str) and prefix.strip() and prefix == prefix.strip() for prefix in prefixes):
+                raise ValueError(f"The comment prefixes of '{extension}' should be non-empty strings without surrounding whitespace, but got: {list(prefixes)}")
+
+    def find_begin(self, text, start=0):
+        """
+        Returns the offset of the first begin marker in the given text or bytes from start
+        on, together with that marker, or -1 and None if there is none.
+        """
+        if self.__begin_pattern is not None:
+            match = (self.__begin_pattern if isinstance(text, str) else self.__begin_bytes_pattern).search(text, start)
+            if match is None:
+                return -1, None
+            return match.start(), match.group()
+        begin_offset, found_begin_marker = -1, None
+        for begin_marker in self.__begin_markers if isinstance(text, str) else self.__begin_markers_bytes:
+            # Only a marker that begins before the one found so far can come first
+            end = len(text) if begin_offset == -1 else begin_offset + len(begin_marker)
+            offset = text.find(begin_marker, start, end)
+            if offset != -1 and (begin_offset == -1 or offset < begin_offset):
+                begin_offset, found_begin_marker = offset, begin_marker
+        return begin_offset, found_begin_marker
+
+    def is_configuration_file(self, path):
+        return self.__configuration_path is not None and os.path.abspath(path) == self.__configuration_path
+
+    def end_marker(self, begin_marker):
+        return self.__end_markers[begin_marker]
+
+    def comment_prefixes(self, source_file_path):
+        """
+        Returns the comment prefixes that the statement lines of the given source file must
+        start with, or None if statements may appear on any line.
+        """
+        return self.__comment_prefixes.get(os.path.splitext(source_file_path)[1])
+
+    @property
+    def fingerprint(self):
+        """
+        A hash of the syntax, or None for the default syntax, which tells whether the source
+        files recorded in a scan manifest were parsed with the same syntax.
+        """
+        if self.__markers == self.DEFAULT_MARKERS and not self.__comment_prefixes:
+            return None
+        data = {"markers": self.__markers, "comment_prefixes": self.__comment_prefixes}
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
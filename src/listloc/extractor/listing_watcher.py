@@ -0,0 +1,243 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from listloc.extractor.action_logger import ActionLogger
+from listloc.extractor.file_extractor import FileExtractor
+from listloc.extractor.listing_extractor import ListingExtractor
+from listloc.extractor.listing_syntax import ListingSyntax
+from listloc.extractor.listing_index import ListingIndex
+from listloc.extractor.path_filter import PathFilter
+from listloc.extractor.scan_manifest import ScanManifest
+from listloc.extractor.tree_walker import TreeWalker
+
+
+class ListingWatcher:
+    """
+    Runs one full extraction and then keeps re-extracting only the source files that are
+    changed, created or deleted. Listings of deleted source files and of removed listing
+    declarations are pruned using the scan manifest, so the tree is never rescanned.
+    """
+
+    def __init__(self, base_directory_path, verbose=False, exclude_patterns=(), use_ignore_files=True, use_polling=False, interval=1.0, debounce=0.2, syntax: ListingSyntax = None):
+        self.__base_directory_path = base_directory_path
+        self.__verbose = verbose
+        self.__exclude_patterns = exclude_patterns
+        self.__use_ignore_files = use_ignore_files
+        self.__path_filter = PathFilter(base_directory_path, exclude_patterns, use_ignore_files)
+        self.__tree_walker = TreeWalker(base_directory_path, self.__path_filter)
+        self.__use_polling = use_polling or not InotifyChangeSource.is_available()
+        self.__interval = interval
+        self.__debounce = debounce
+        self.__manifest = None
+        self.__syntax = syntax or ListingSyntax.default()
+
+    def watch(self):
+        self.extract_all_listings()
+        change_source = self.__create_change_source()
+        try:
+            while True:
+                changed_paths = change_source.wait_for_changes(self.__debounce)
+                if changed_paths is None:
+                    self.extract_all_listings()
+                else:
+                    self.extract_changed_listings(changed_paths)
+        finally:
+            change_source.close()
+
+    def __create_change_source(self):
+        if self.__use_polling:
+            return PollingChangeSource(self.__tree_walker, self.__interval)
+        return InotifyChangeSource(self.__tree_walker, self.__path_filter)
+
+    def extract_all_listings(self):
+        logger = ActionLogger(self.__base_directory_path, verbose=self.__verbose)
+        extractor = ListingExtractor(self.__base_directory_path, logger, exclude_patterns=self.__exclude_patterns, use_ignore_files=self.__use_ignore_files, syntax=self.__syntax)
+        self.__run_reporting_errors(logger, extractor.extract_all_listings)
+        self.__manifest = ScanManifest(self.__base_directory_path, self.__syntax.fingerprint)
+
+    def extract_changed_listings(self, changed_paths):
+        logger = ActionLogger(self.__base_directory_path, verbose=self.__verbose)
+        self.__run_reporting_errors(logger, lambda: self.__extract_changed_listings(changed_paths, logger))
+        self.__manifest.save()
+
+    def __extract_changed_listings(self, changed_paths, logger):
+        # Indexes written by 'listloc extract --index' are kept up to date, but none are created
+        listing_index = ListingIndex(logger, existing_only=True)
+        stale_listing_file_paths = set()
+        for path in sorted(changed_paths):
+            if os.path.isfile(path):
+                if not self.__path_filter.excludes_file(path) and not self.__syntax.is_configuration_file(path):
+                    FileExtractor(path, logger, self.__manifest, listing_index=listing_index, syntax=self.__syntax, stale_listing_file_paths=stale_listing_file_paths).extract_listings()
+                continue
+            for source_file_path in self.__manifest.source_paths_under(path):
+                FileExtractor(source_file_path, logger, self.__manifest, listing_index=listing_index, stale_listing_file_paths=stale_listing_file_paths).remove_extracted_listings()
+        FileExtractor.delete_stale_listing_files(stale_listing_file_paths, logger, self.__manifest)
+        listing_index.save()
+
+    @staticmethod
+    def __run_reporting_errors(logger, extract):
+        # A declaration that is invalid while it is being edited must not stop the watcher
+        try:
+            extract()
+        except Exception as e:
+            logger.log_error(e)
+            return
+        logger.summarize_changes()
+
+
+class PollingChangeSource:
+    """
+    Detects changed source files by comparing the size and mtime_ns of every file in the
+    tree, sampled every interval. A change is only reported once a following sample shows no
+    further changes, so that bursts of writes by an editor are reported together.
+    """
+
+    def __init__(self, tree_walker: TreeWalker, interval):
+        self.__tree_walker = tree_walker
+        self.__interval = interval
+        self.__snapshot = self.__take_snapshot()
+
+    def wait_for_changes(self, debounce, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed_paths = set()
+        while True:
+            time.sleep(debounce if changed_paths else self.__interval)
+            snapshot = self.__take_snapshot()
+            newly_changed_paths = self.__changed_paths(self.__snapshot, snapshot)
+            self.__snapshot = snapshot
+            if changed_paths and not newly_changed_paths:
+                return changed_paths
+            changed_paths |= newly_changed_paths
+            if not changed_paths and deadline is not None and time.monotonic() >= deadline:
+                return changed_paths
+
+    def __take_snapshot(self):
+        snapshot = {}
+        for path in self.__tree_walker.file_paths():
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat_result.st_size, stat_result.st_mtime_ns)
+        return snapshot
+
+    @staticmethod
+    def __changed_paths(old_snapshot, new_snapshot):
+        changed_paths = {path for path, state in new_snapshot.items() if old_snapshot.get(path) != state}
+        changed_paths.update(path for path in old_snapshot if path not in new_snapshot)
+        return changed_paths
+
+    def close(self):
+        pass
+
+
+class InotifyChangeSource:
+    """
+    Detects changed source files through Linux inotify, with one watch per directory that is
+    not excluded by the path filter. Events are collected until none have arrived for the
+    debounce interval, so that bursts of writes by an editor are reported together.
+    """
+    __IN_CLOSE_WRITE = 0x00000008
+    __IN_MOVED_FROM = 0x00000040
+    __IN_MOVED_TO = 0x00000080
+    __IN_CREATE = 0x00000100
+    __IN_DELETE = 0x00000200
+    __IN_Q_OVERFLOW = 0x00004000
+    __IN_IGNORED = 0x00008000
+    __IN_ISDIR = 0x40000000
+    __WATCH_MASK = __IN_CLOSE_WRITE | __IN_MOVED_FROM | __IN_MOVED_TO | __IN_CREATE | __IN_DELETE
+    __EVENT_HEADER = struct.Struct("iIII")
+    __READ_SIZE = 1 << 16
+
+    @staticmethod
+    def __load_libc():
+        return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+    @classmethod
+    def is_available(cls):
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            return hasattr(cls.__load_libc(), "inotify_init1")
+        except OSError:
+            return False
+
+    def __init__(self, tree_walker: TreeWalker, path_filter: PathFilter):
+        self.__tree_walker = tree_walker
+        self.__path_filter = path_filter
+        self.__libc = self.__load_libc()
+        self.__file_descriptor = self.__libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.__file_descriptor < 0:
+            self.__raise_os_error()
+        self.__directory_paths = {}
+        for directory_path in tree_walker.directory_paths():
+            self.__add_watch(directory_path)
+
+    def __raise_os_error(self):
+        error_number = ctypes.get_errno()
+        raise OSError(error_number, os.strerror(error_number))
+
+    def __add_watch(self, directory_path):
+        watch_descriptor = self.__libc.inotify_add_watch(self.__file_descriptor, os.fsencode(directory_path), self.__WATCH_MASK)
+        if watch_descriptor < 0:
+            # The directory may already be gone again
+            if ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):
+                return
+            self.__raise_os_error()
+        self.__directory_paths[watch_descriptor] = directory_path
+
+    def wait_for_changes(self, debounce, timeout=None):
+        """
+        Returns the paths of the changed files and directories, or None if events were lost
+        and the whole tree has to be extracted again.
+        """
+        changed_paths = set()
+        if not select.select([self.__file_descriptor], [], [], timeout)[0]:
+            return changed_paths
+        while select.select([self.__file_descriptor], [], [], debounce)[0]:
+            if not self.__read_events(changed_paths):
+                return None
+        return changed_paths
+
+    def __read_events(self, changed_paths):
+        try:
+            buffer = os.read(self.__file_descriptor, self.__READ_SIZE)
+        except BlockingIOError:
+            return True
+        offset = 0
+        while offset < len(buffer):
+            watch_descriptor, mask, cookie, name_length = self.__EVENT_HEADER.unpack_from(buffer, offset)
+            offset += self.__EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            if mask & self.__IN_Q_OVERFLOW:
+                return False
+            if mask & self.__IN_IGNORED:
+                self.__directory_paths.pop(watch_descriptor, None)
+                continue
+            directory_path = self.__directory_paths.get(watch_descriptor)
+            if directory_path is not None and name:
+                self.__handle_event(os.path.join(directory_path, name), mask, changed_paths)
+        return True
+
+    def __handle_event(self, path, mask, changed_paths):
+        if not mask & self.__IN_ISDIR:
+            if not self.__path_filter.excludes_file(path):
+                changed_paths.add(path)
+            return
+        if self.__path_filter.excludes_directory(path):
+            return
+        if mask & (self.__IN_CREATE | self.__IN_MOVED_TO):
+            for directory_path in self.__tree_walker.directory_paths(path):
+                self.__add_watch(directory_path)
+            changed_paths.update(self.__tree_walker.file_paths(path))
+        else:
+            changed_paths.add(path)
+
+    def close(self):
+        os.close(self.__file_descriptor)
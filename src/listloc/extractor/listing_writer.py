@@ -0,0 +1,119 @@
+import os
+import sys
+
+
+class ListingWriter:
+    """
+    Writes listing files atomically: the content goes to a temporary file in the same
+    directory, which then replaces the listing file, so concurrent readers never see a
+    truncated listing. In durable mode, the temporary files are only moved into place by
+    flush, once their data is on disk. One syncfs per file system makes all of them durable
+    together, or each file is fsynced where syncfs is not available. The renames are then
+    made durable with one fsync per touched directory, so that a crash never leaves an empty
+    or truncated listing file, even on file systems that do not order renames after data.
+    """
+    TEMPORARY_FILE_SUFFIX = ".tmp"
+
+    def __init__(self, durable=False):
+        self.__durable = durable
+        self.__syncfs = self.__load_syncfs() if durable else None
+        self.__pending_temporary_paths = {}
+        self.__number_of_temporary_files = 0
+
+    @staticmethod
+    def __load_syncfs():
+        if not sys.platform.startswith("linux"):
+            return None
+        # Imported here because only durable runs call into libc
+        import ctypes
+        try:
+            return getattr(ctypes.CDLL(None, use_errno=True), "syncfs", None)
+        except OSError:
+            return None
+
+    def write(self, path, content_bytes):
+        temporary_path = self.__temporary_path(path)
+        try:
+            with open(temporary_path, "wb") as f:
+                f.write(content_bytes)
+                if self.__durable and self.__syncfs is None:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if not self.__durable:
+                os.replace(temporary_path, path)
+        except BaseException:
+            self.__remove_if_present(temporary_path)
+            raise
+        if self.__durable:
+            # A listing written twice in one run only keeps its last content
+            replaced_temporary_path = self.__pending_temporary_paths.pop(path, None)
+            if replaced_temporary_path is not None:
+                self.__remove_if_present(replaced_temporary_path)
+            self.__pending_temporary_paths[path] = temporary_path
+
+    def __temporary_path(self, path):
+        if not self.__durable:
+            return f"{path}.{os.getpid()}{self.TEMPORARY_FILE_SUFFIX}"
+        self.__number_of_temporary_files += 1
+        return f"{path}.{os.getpid()}.{self.__number_of_temporary_files}{self.TEMPORARY_FILE_SUFFIX}"
+
+    @staticmethod
+    def __remove_if_present(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def flush(self):
+        if not self.__pending_temporary_paths:
+            return
+        pending_temporary_paths, self.__pending_temporary_paths = self.__pending_temporary_paths, {}
+        directory_paths = sorted({os.path.dirname(path) for path in pending_temporary_paths})
+        try:
+            if self.__syncfs is not None and not self.__sync_file_systems(directory_paths):
+                for temporary_path in pending_temporary_paths.values():
+                    self.__fsync_file(temporary_path)
+            for path in list(pending_temporary_paths):
+                os.replace(pending_temporary_paths.pop(path), path)
+        finally:
+            for temporary_path in pending_temporary_paths.values():
+                self.__remove_if_present(temporary_path)
+        for directory_path in directory_paths:
+            self.__fsync_directory(directory_path)
+
+    def __sync_file_systems(self, directory_paths):
+        synced_devices = set()
+        for directory_path in directory_paths:
+            try:
+                directory_descriptor = os.open(directory_path, os.O_RDONLY)
+            except OSError:
+                return False
+            try:
+                device = os.fstat(directory_descriptor).st_dev
+                if device not in synced_devices:
+                    if self.__syncfs(directory_descriptor) != 0:
+                        return False
+                    synced_devices.add(device)
+            finally:
+                os.close(directory_descriptor)
+        return True
+
+    @staticmethod
+    def __fsync_file(path):
+        file_descriptor = os.open(path, os.O_RDWR)
+        try:
+            os.fsync(file_descriptor)
+        finally:
+            os.close(file_descriptor)
+
+    @staticmethod
+    def __fsync_directory(directory_path):
+        try:
+            directory_descriptor = os.open(directory_path, os.O_RDONLY)
+        except OSError:
+            # Directories cannot be opened on every platform
+            return
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
@@ -0,0 +1,44 @@
+import threading
+from collections import OrderedDict
+
+
+class ParseCache:
+    """
+    Least recently used cache of the listings parsed from source files, keyed by the content
+    hash of the source file and the comment rules it was parsed with, so that copies of a
+    source file are only parsed once. Listings
+    are never modified after construction, so the same objects are shared between all copies.
+    The cache is bounded by the approximate size of the cached listings, measured as the
+    bytes from the first begin statement to the end of each source file. It is safe to use
+    from several threads, but not shared between processes.
+    """
+    DEFAULT_MAX_BYTES = 64 << 20
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            self.__entries.move_to_end(key)
+            return list(entry[0])
+
+    def put(self, key, listings, size):
+        if size > self.__max_bytes:
+            return
+        with self.__lock:
+            if key in self.__entries:
+                return
+            self.__entries[key] = (tuple(listings), size)
+            self.__size += size
+            while self.__size > self.__max_bytes:
+                evicted_key, (evicted_listings, evicted_size) = self.__entries.popitem(last=False)
+                self.__size -= evicted_size
+
+    def __len__(self):
+        return len(self.__entries)
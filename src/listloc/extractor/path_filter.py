@@ -0,0 +1,46 @@
+import os
+import re
+import fnmatch
+from listloc.extractor.listing_constants import ListingConstants
+from listloc.extractor.ignore_rules import IgnoreRulesTree
+
+
+class PathFilter:
+    """
+    Decides which directories are descended into and which files are read while walking a
+    base directory. Directories in the built-in exclude set are always skipped, as are paths
+    whose name or path relative to the base directory matches one of the exclude globs, and,
+    unless disabled, paths ignored by a '.gitignore' or '.listlocignore' file.
+    """
+
+    def __init__(self, base_directory_path, exclude_patterns=(), use_ignore_files=True):
+        self.__base_directory_path = base_directory_path
+        self.__exclude_pattern = self.__compile(exclude_patterns)
+        self.__ignore_rules = IgnoreRulesTree(base_directory_path, ListingConstants.IGNORE_FILE_NAMES) if use_ignore_files else None
+
+    @staticmethod
+    def __compile(exclude_patterns):
+        if not exclude_patterns:
+            return None
+        return re.compile("|".join(f"(?:{fnmatch.translate(pattern.rstrip('/'))})" for pattern in exclude_patterns))
+
+    def excludes_directory(self, directory_path):
+        if os.path.basename(directory_path) in ListingConstants.DEFAULT_EXCLUDED_DIRECTORY_NAMES:
+            return True
+        return self.__matches_exclude_pattern(directory_path) or self.__is_ignored(directory_path, is_directory=True)
+
+    def excludes_file(self, file_path):
+        if os.path.basename(file_path) in (ListingConstants.CACHE_FILE_NAME, ListingConstants.CACHE_TEMPORARY_FILE_NAME, ListingConstants.BUNDLE_FILE_NAME):
+            return True
+        return self.__matches_exclude_pattern(file_path) or self.__is_ignored(file_path, is_directory=False)
+
+    def __is_ignored(self, path, is_directory):
+        return self.__ignore_rules is not None and self.__ignore_rules.ignores(path, is_directory)
+
+    def __matches_exclude_pattern(self, path):
+        if self.__exclude_pattern is None:
+            return False
+        if self.__exclude_pattern.match(os.path.basename(path)):
+            return True
+        relative_path = os.path.relpath(path, self.__base_directory_path).replace(os.sep, "/")
+        return self.__exclude_pattern.match(relative_path) is not None
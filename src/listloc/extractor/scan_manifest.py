@@ -0,0 +1,122 @@
+import os
+import json
+import hashlib
+from listloc.extractor.listing_constants import ListingConstants
+
+
+class ScanManifest:
+    """
+    On-disk record of every scanned source file under a base directory. Each entry holds
+    the size, mtime_ns and content hash of the source file, together with the names of the
+    listings it produced, so that unchanged files can be skipped on later runs. No file is
+    skipped if the manifest was recorded with another listing syntax, but the listing names
+    of its entries are still used to delete the listings that the source files no longer
+    produce. The manifest is only written again when an entry changed.
+    """
+    VERSION = 1
+
+    def __init__(self, base_directory_path, syntax_fingerprint=None):
+        self.__base_directory_path = base_directory_path
+        self.__syntax_fingerprint = syntax_fingerprint
+        self.__manifest_path = os.path.join(base_directory_path, ListingConstants.CACHE_FILE_NAME)
+        self.__syntax_changed = False
+        self.__changed = True
+        self.__entries = self.__load()
+        self.__seen = set()
+
+    def __load(self):
+        try:
+            with open(self.__manifest_path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        self.__syntax_changed = data.get("syntax") != self.__syntax_fingerprint
+        self.__changed = self.__syntax_changed
+        return data.get("sources", {})
+
+    def __key(self, source_path):
+        return os.path.relpath(source_path, self.__base_directory_path)
+
+    def __path(self, key):
+        return os.path.join(self.__base_directory_path, key)
+
+    @staticmethod
+    def digest(source_bytes):
+        return hashlib.sha256(source_bytes).hexdigest()
+
+    def mark_seen(self, source_path):
+        self.__seen.add(self.__key(source_path))
+
+    @staticmethod
+    def entry_has_stat(entry, stat_result):
+        return entry is not None and entry["size"] == stat_result.st_size and entry["mtime_ns"] == stat_result.st_mtime_ns
+
+    @staticmethod
+    def entry_has_digest(entry, digest):
+        return entry is not None and entry["digest"] == digest
+
+    def entry(self, source_path):
+        if self.__syntax_changed:
+            return None
+        return self.__entries.get(self.__key(source_path))
+
+    def listing_names(self, source_path):
+        entry = self.__entries.get(self.__key(source_path))
+        return list(entry["listings"]) if entry else []
+
+    def record(self, source_path, stat_result, digest, listing_names):
+        entry = {
+            "size": stat_result.st_size,
+            "mtime_ns": stat_result.st_mtime_ns,
+            "digest": digest,
+            "listings": list(listing_names),
+        }
+        key = self.__key(source_path)
+        if self.__entries.get(key) != entry:
+            self.__entries[key] = entry
+            self.__changed = True
+
+    def forget(self, source_path):
+        if self.__entries.pop(self.__key(source_path), None) is not None:
+            self.__changed = True
+
+    def records_listing(self, listing_file_path):
+        """
+        Returns whether a recorded source file next to the given listing file's directory
+        still produces it.
+        """
+        source_directory_key = os.path.dirname(self.__key(os.path.dirname(listing_file_path)))
+        name = os.path.basename(listing_file_path)[:-len(ListingConstants.LISTING_FILE_EXTENSION)]
+        return any(os.path.dirname(key) == source_directory_key and name in entry["listings"] for key, entry in self.__entries.items())
+
+    def unseen_source_paths(self):
+        return [self.__path(key) for key in self.__entries if key not in self.__seen]
+
+    def source_paths_under(self, path):
+        """
+        Returns the recorded source paths that are the given path or lie beneath it.
+        """
+        key = self.__key(path)
+        prefix = key + os.sep
+        return [self.__path(source_key) for source_key in self.__entries if source_key == key or source_key.startswith(prefix)]
+
+    def save(self):
+        if not self.__changed:
+            return
+        data = {"version": self.VERSION, "sources": self.__entries}
+        if self.__syntax_fingerprint is not None:
+            data["syntax"] = self.__syntax_fingerprint
+        temporary_path = os.path.join(self.__base_directory_path, ListingConstants.CACHE_TEMPORARY_FILE_NAME)
+        with open(temporary_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, sort_keys=True)
+        os.replace(temporary_path, self.__manifest_path)
+        self.__changed = False
+
+    @staticmethod
+    def discard(base_directory_path):
+        try:
+            os.remove(os.path.join(base_directory_path, ListingConstants.CACHE_FILE_NAME))
+        except FileNotFoundError:
+            pass
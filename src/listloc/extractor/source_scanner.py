@@ -0,0 +1,244 @@
+import io
+import os
+import mmap
+import time
+import codecs
+from listloc.extractor.listing_constants import ListingConstants
+from listloc.extractor.listing import Listing
+from listloc.extractor.listing_parser import ListingParser
+from listloc.extractor.listing_syntax import ListingSyntax
+from listloc.extractor.scan_manifest import ScanManifest
+from listloc.extractor.parse_cache import ParseCache
+
+
+class SourceScan:
+    """
+    The outcome of reading and parsing one source file, without any side effects on disk.
+    """
+
+    def __init__(self, source_file_path):
+        self.source_file_path = source_file_path
+        self.stat_result = None
+        self.digest = None
+        self.is_text = False
+        self.listings = []
+        self.unchanged = False
+        self.error = None
+        self.cached = False
+        self.bytes_read = 0
+        self.phase_times = None
+
+
+class SourceScanner:
+    __CHUNK_SIZE = 1 << 16
+    __MMAP_THRESHOLD = 1 << 20
+    __LINE_COUNT_CHUNK_SIZE = 1 << 20
+
+    def __init__(self, source_file_path, manifest_entry=None, track_changes=False, record_phase_times=False, parse_cache: ParseCache = None, syntax: ListingSyntax = None, count_lines=False):
+        self.__source_file_path = source_file_path
+        self.__listing_directory_path = os.path.join(os.path.dirname(source_file_path), ListingConstants.LISTING_DIRECTORY_NAME)
+        self.__manifest_entry = manifest_entry
+        self.__track_changes = track_changes
+        self.__phase_times = {} if record_phase_times else None
+        self.__parse_cache = parse_cache
+        self.__syntax = syntax or ListingSyntax.default()
+        self.__comment_prefixes = self.__syntax.comment_prefixes(source_file_path)
+        self.__count_lines = count_lines
+
+    def scan(self):
+        """
+        Reads the source file once as bytes, or memory-maps it if it is large, and only decodes
+        and parses it if it contains a begin marker of the syntax. Small files are parsed line by line
+        from the line of the first begin statement, while in memory-mapped files only the spans
+        between begin and end statements are decoded, so that memory use is bounded by the
+        largest listing rather than by the file size. Line breaks are only counted across a
+        memory-mapped file when count_lines is set, since only listing indexes need the line
+        ranges of listings, which are None otherwise. When changes are tracked, the stat
+        result and content hash are recorded, and the file is marked as unchanged instead of
+        parsed if it matches its manifest entry and all of its listing files still exist.
+        With a parse cache, a file with the same content hash as a file parsed before reuses
+        its listings instead of being parsed again. Files are only hashed for the parse cache
+        once they are known to contain a begin marker.
+        When phase times are recorded, the time spent reading, hashing, checking the encoding,
+        parsing and constructing listings is stored on the result as well.
+        Listing errors are stored on the result rather than raised, so that scans can run on
+        worker threads or processes and be applied in order afterwards.
+        """
+        source_scan = SourceScan(self.__source_file_path)
+        source_scan.phase_times = self.__phase_times
+        try:
+            if self.__track_changes:
+                source_scan.stat_result = os.stat(self.__source_file_path)
+                if self.__is_unchanged(ScanManifest.entry_has_stat(self.__manifest_entry, source_scan.stat_result)):
+                    source_scan.digest = self.__manifest_entry["digest"]
+                    source_scan.unchanged = True
+                    return source_scan
+            with open(self.__source_file_path, "rb") as f:
+                self.__scan_file(f, source_scan)
+        except OSError:
+            return SourceScan(self.__source_file_path)
+        if self.__track_changes and self.__is_unchanged(ScanManifest.entry_has_digest(self.__manifest_entry, source_scan.digest)):
+            source_scan.is_text = False
+            source_scan.listings = []
+            source_scan.error = None
+            source_scan.unchanged = True
+        return source_scan
+
+    def __scan_file(self, f, source_scan):
+        source_scan.bytes_read = os.fstat(f.fileno()).st_size
+        if source_scan.bytes_read < self.__MMAP_THRESHOLD:
+            self.__scan_buffer(self.__timed("read", f.read), source_scan, self.__parse_lines)
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source_map:
+            self.__scan_buffer(source_map, source_scan, self.__parse_spans)
+
+    def __scan_buffer(self, source_buffer, source_scan, parse):
+        if self.__track_changes:
+            source_scan.digest = self.__timed("hash", ScanManifest.digest, source_buffer)
+        source_scan.is_text = self.__timed("encoding_check", self.__is_utf8_encoding, source_buffer)
+        if not source_scan.is_text:
+            return
+        begin_offset = self.__syntax.find_begin(source_buffer)[0]
+        if begin_offset == -1:
+            return
+        if source_scan.digest is None and self.__parse_cache is not None:
+            # Only files with a begin marker are hashed for the parse cache alone
+            source_scan.digest = self.__timed("hash", ScanManifest.digest, source_buffer)
+        # Copies with another extension may follow other comment rules, so the rules are part of the key
+        cache_key = (source_scan.digest, self.__comment_prefixes, self.__count_lines)
+        if self.__parse_cache is not None:
+            cached_listings = self.__parse_cache.get(cache_key)
+            if cached_listings is not None:
+                source_scan.listings = cached_listings
+                source_scan.cached = True
+                return
+        try:
+            source_scan.listings = self.__timed("parse", parse, source_buffer, begin_offset)
+        except Exception as e:
+            # Errors are not cached, since their messages name the source file
+            source_scan.error = e
+        if self.__phase_times is not None:
+            # Listings are constructed while parsing, so their time is only counted once
+            self.__phase_times["parse"] -= self.__phase_times.get("listing_construction", 0.0)
+        if self.__parse_cache is not None and source_scan.error is None:
+            self.__parse_cache.put(cache_key, source_scan.listings, len(source_buffer) - begin_offset)
+
+    def __parse_lines(self, source_buffer, begin_offset):
+        line_offset = max(source_buffer.rfind(b"\n", 0, begin_offset), source_buffer.rfind(b"\r", 0, begin_offset)) + 1
+        chunks = (source_buffer[offset:offset + self.__CHUNK_SIZE] for offset in range(line_offset, len(source_buffer), self.__CHUNK_SIZE))
+        first_line_number = 1 + self.__count_line_breaks(source_buffer, 0, line_offset)
+        parser = ListingParser(self.__source_file_path, self.__phase_times, first_line_number, self.__syntax)
+        self.__parse_chunks(parser, chunks)
+        return parser.listings
+
+    def __parse_spans(self, source_buffer, begin_offset):
+        """
+        Locates the begin and end statement offsets in the raw bytes and decodes only the spans
+        between them, so that no more than one listing is held as text at a time. If lines are
+        counted, line numbers are counted in chunks between the spans.
+        """
+        listings = []
+        line_number, line_number_offset = 1, 0
+        comment_prefixes = tuple(prefix.encode("utf-8") for prefix in self.__comment_prefixes) if self.__comment_prefixes is not None else None
+        begin_offset, begin_marker = self.__find_statement(source_buffer, begin_offset, None, comment_prefixes)
+        while begin_offset != -1:
+            end_marker = self.__syntax.end_marker(begin_marker)
+            end_offset, end_marker = self.__find_statement(source_buffer, begin_offset + len(begin_marker), end_marker, comment_prefixes)
+            if end_offset == -1:
+                break
+            end_offset += len(end_marker)
+            if self.__count_lines:
+                line_number += self.__count_line_breaks(source_buffer, line_number_offset, begin_offset)
+                line_number_offset = begin_offset
+            listing_string = source_buffer[begin_offset:end_offset].decode("utf-8")
+            listings.append(self.__construct_listing(listing_string, line_number if self.__count_lines else None, begin_marker.decode("utf-8"), end_marker.decode("utf-8")))
+            begin_offset, begin_marker = self.__find_statement(source_buffer, end_offset, None, comment_prefixes)
+        return listings
+
+    def __find_statement(self, source_buffer, start, end_marker, comment_prefixes):
+        """
+        Returns the offset and marker of the next begin marker from start on, or of the given
+        end marker, skipping markers outside of comment lines if comment prefixes are given.
+        """
+        while True:
+            if end_marker is None:
+                offset, marker = self.__syntax.find_begin(source_buffer, start)
+            else:
+                offset, marker = source_buffer.find(end_marker, start), end_marker
+            if offset == -1 or comment_prefixes is None:
+                return offset, marker
+            line_offset = max(source_buffer.rfind(b"\n", 0, offset), source_buffer.rfind(b"\r", 0, offset)) + 1
+            if source_buffer[line_offset:offset].lstrip().startswith(comment_prefixes):
+                return offset, marker
+            start = offset + len(marker)
+
+    @classmethod
+    def __count_line_breaks(cls, source_buffer, start, end):
+        """
+        Counts the line breaks between start and end, where '\r\n' is one break. Bytes are
+        counted in place, while memory-mapped files, which cannot be counted in place, are
+        copied chunk by chunk into one reused buffer.
+        """
+        if isinstance(source_buffer, bytes):
+            return cls.__count_line_breaks_in(source_buffer, start, end)
+        line_breaks = 0
+        chunk = bytearray(min(cls.__LINE_COUNT_CHUNK_SIZE, max(end - start, 0)))
+        with memoryview(source_buffer) as source_view:
+            for chunk_start in range(start, end, cls.__LINE_COUNT_CHUNK_SIZE):
+                chunk_end = min(chunk_start + cls.__LINE_COUNT_CHUNK_SIZE, end)
+                chunk[:chunk_end - chunk_start] = source_view[chunk_start:chunk_end]
+                line_breaks += cls.__count_line_breaks_in(chunk, 0, chunk_end - chunk_start)
+                # A '\r\n' split between two chunks is one line break
+                if chunk_end < end and source_view[chunk_end - 1] == 0x0D and source_view[chunk_end] == 0x0A:
+                    line_breaks -= 1
+        return line_breaks
+
+    @staticmethod
+    def __count_line_breaks_in(buffer, start, end):
+        line_breaks = buffer.count(b"\n", start, end)
+        # Most files have no '\r' at all, which one search tells without counting it twice
+        if buffer.find(b"\r", start, end) != -1:
+            line_breaks += buffer.count(b"\r", start, end) - buffer.count(b"\r\n", start, end)
+        return line_breaks
+
+    def __construct_listing(self, listing_string, first_line, begin_marker, end_marker):
+        try:
+            return self.__timed("listing_construction", Listing, listing_string, first_line, begin_marker, end_marker)
+        except Exception as e:
+            raise type(e)(f"In file '{self.__source_file_path}': {e}") from e
+
+    def __timed(self, phase, function, *args):
+        if self.__phase_times is None:
+            return function(*args)
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.__phase_times[phase] = self.__phase_times.get(phase, 0.0) + time.perf_counter() - start
+
+    @staticmethod
+    def __parse_chunks(parser, chunks):
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True)
+        partial_line = ""
+        for chunk in chunks:
+            lines = (partial_line + decoder.decode(chunk)).split("\n")
+            partial_line = lines.pop()
+            for line in lines:
+                parser.feed_line(line)
+        parser.feed_line(partial_line + decoder.decode(b"", final=True))
+
+    def __is_unchanged(self, entry_matches):
+        if not entry_matches:
+            return False
+        for name in self.__manifest_entry["listings"]:
+            if not os.path.isfile(os.path.join(self.__listing_directory_path, name + ListingConstants.LISTING_FILE_EXTENSION)):
+                return False
+        return True
+
+    def __is_utf8_encoding(self, source_bytes, blocksize=8192):
+        try:
+            # If it decodes to UTF-8 without error, assume it's a text file
+            source_bytes[:blocksize].decode('utf-8')
+            return True
+        except UnicodeDecodeError:
+            return False
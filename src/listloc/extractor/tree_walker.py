@@ -0,0 +1,122 @@
+import os
+from listloc.extractor.listing_constants import ListingConstants
+from listloc.extractor.path_filter import PathFilter
+
+
+class ListingDirectory:
+    """
+    A 'listings/' directory found during a walk, with the listing files it held at that time.
+    """
+
+    def __init__(self, path, listing_file_paths):
+        self.path = path
+        self.listing_file_paths = listing_file_paths
+
+
+class TreeWalker:
+    """
+    Walks a base directory with os.scandir in a single pass, using the file type cached on
+    each directory entry, while pruning every directory excluded by the path filter so that
+    excluded subtrees are never entered. The generated 'listings/' directories are never
+    descended into, but their listing files can be collected in the same pass.
+    """
+
+    def __init__(self, base_directory_path, path_filter: PathFilter):
+        self.__base_directory_path = base_directory_path
+        self.__path_filter = path_filter
+
+    def source_file_paths(self, directory_path=None, listing_directories=None):
+        """
+        Yields the path of every source file that is not excluded. If a list is given as
+        listing_directories, every listing directory found on the way is appended to it.
+        """
+        for root, file_paths, listing_directory_path in self.__walk(directory_path):
+            if listing_directories is not None and listing_directory_path is not None:
+                listing_directories.append(self.__read_listing_directory(listing_directory_path))
+            for file_path in file_paths:
+                if not self.__path_filter.excludes_file(file_path):
+                    yield file_path
+
+    def file_paths(self, directory_path=None):
+        return list(self.source_file_paths(directory_path))
+
+    def directory_source_file_paths(self, directory_path):
+        """
+        Returns the paths of the source files directly in the given directory, without
+        descending into its subdirectories.
+        """
+        try:
+            with os.scandir(directory_path) as entries:
+                file_paths = [entry.path for entry in entries if not self.__is_directory(entry)]
+        except OSError:
+            return []
+        return [file_path for file_path in file_paths if not self.__path_filter.excludes_file(file_path)]
+
+    def listing_directory(self, directory_path):
+        """
+        Returns the listing directory of the given directory, or None if it has none.
+        """
+        listing_directory_path = os.path.join(directory_path, ListingConstants.LISTING_DIRECTORY_NAME)
+        if not os.path.isdir(listing_directory_path):
+            return None
+        return self.__read_listing_directory(listing_directory_path)
+
+    def excludes(self, path, is_directory):
+        """
+        Returns whether a walk of the base directory would skip the given path, because it or
+        one of the directories between it and the base directory is excluded.
+        """
+        base_directory_path = os.path.abspath(self.__base_directory_path)
+        directory_path = os.path.abspath(path) if is_directory else os.path.dirname(os.path.abspath(path))
+        while directory_path != base_directory_path and directory_path.startswith(base_directory_path + os.sep):
+            if os.path.basename(directory_path) == ListingConstants.LISTING_DIRECTORY_NAME or self.__path_filter.excludes_directory(directory_path):
+                return True
+            directory_path = os.path.dirname(directory_path)
+        return not is_directory and self.__path_filter.excludes_file(path)
+
+    def directory_paths(self, directory_path=None):
+        return [root for root, file_paths, listing_directory_path in self.__walk(directory_path)]
+
+    def listing_directories(self):
+        listing_directories = []
+        for root, file_paths, listing_directory_path in self.__walk(None):
+            if listing_directory_path is not None:
+                listing_directories.append(self.__read_listing_directory(listing_directory_path))
+        return listing_directories
+
+    def __walk(self, directory_path):
+        pending_directory_paths = [directory_path or self.__base_directory_path]
+        while pending_directory_paths:
+            root = pending_directory_paths.pop()
+            try:
+                with os.scandir(root) as entries:
+                    entries = list(entries)
+            except OSError:
+                continue
+            file_paths = []
+            subdirectory_paths = []
+            listing_directory_path = None
+            for entry in entries:
+                if not self.__is_directory(entry):
+                    file_paths.append(entry.path)
+                elif entry.name == ListingConstants.LISTING_DIRECTORY_NAME:
+                    listing_directory_path = entry.path
+                elif not entry.is_symlink() and not self.__path_filter.excludes_directory(entry.path):
+                    subdirectory_paths.append(entry.path)
+            yield root, file_paths, listing_directory_path
+            pending_directory_paths.extend(reversed(subdirectory_paths))
+
+    @staticmethod
+    def __is_directory(entry):
+        try:
+            return entry.is_dir()
+        except OSError:
+            return False
+
+    def __read_listing_directory(self, listing_directory_path):
+        try:
+            with os.scandir(listing_directory_path) as entries:
+                listing_file_paths = [entry.path for entry in entries if entry.name.endswith(ListingConstants.LISTING_FILE_EXTENSION) and not self.__is_directory(entry)]
+        except OSError:
+            listing_file_paths = []
+        return ListingDirectory(listing_directory_path, listing_file_paths)
@@ -2,8 +2,13 @@ import typer
 from typing_extensions import Annotated
 from importlib.metadata import version, PackageNotFoundError
 import os
-from listloc.extractor.listing_extractor import ListingExtractor
-from listloc.extractor.action_logger import ActionLogger
+import sys
+from listloc.extractor.listing_extractor import ListingExtractor, ExtractionEngine, OutputFormat
+from listloc.extractor.listing_bundle import ListingBundle
+from listloc.extractor.listing_constants import ListingConstants
+from listloc.extractor.action_logger import ActionLogger, LogOutput
+from listloc.extractor.extraction_stats import ExtractionStats
+from listloc.extractor.listing_syntax import ListingSyntax
 
 
 app = typer.Typer(
@@ -35,52 +40,228 @@ def main(
         ):
     pass
 
-def create_extractor(path: str, verbose: bool):
-    logger = ActionLogger(path, verbose=verbose)
-    return ListingExtractor(path, logger), logger
+def create_extractor(path: str, verbose: bool, use_cache: bool = True, jobs: int = 1, engine: ExtractionEngine = ExtractionEngine.THREAD, exclude: list[str] = None, ignore_files: bool = True, fsync: bool = False, output_format: OutputFormat = OutputFormat.FILES, stats: ExtractionStats = None, output: LogOutput = LogOutput.TEXT, index: bool = False, syntax: ListingSyntax = None):
+    logger = ActionLogger(path, verbose=verbose, output=output)
+    return ListingExtractor(path, logger, use_cache=use_cache, jobs=jobs, engine=engine, exclude_patterns=exclude or (), use_ignore_files=ignore_files, durable=fsync, output_format=output_format, stats=stats, write_index=index, syntax=syntax), logger
+
+def load_syntax(path: str, begin_markers: list[str] = None, end_markers: list[str] = None, comment_prefixes: list[str] = None):
+    begin_markers, end_markers = begin_markers or [], end_markers or []
+    if len(begin_markers) != len(end_markers):
+        raise typer.BadParameter("Each begin marker needs an end marker", param_hint="--begin-marker/--end-marker")
+    prefixes_by_extension = {}
+    for rule in comment_prefixes or []:
+        extension, separator, prefix = rule.partition("=")
+        if not separator:
+            raise typer.BadParameter(f"Expected EXTENSION=PREFIX, but got: '{rule}'", param_hint="--comment-prefix")
+        prefixes_by_extension.setdefault(extension, []).append(prefix)
+    return ListingSyntax.from_pyproject(path, list(zip(begin_markers, end_markers)), prefixes_by_extension)
+
+def run_profiled(function, profile_path: str):
+    if profile_path is None:
+        function()
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(function)
+    finally:
+        profiler.dump_stats(profile_path)
+
+def read_path_list(files_from: str):
+    if files_from == "-":
+        return [line.strip() for line in sys.stdin if line.strip()]
+    with open(files_from, "rt", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
 
 @app.command()
 def extract(
-    path: Annotated[str, typer.Argument()] = os.getcwd(),
+    paths: Annotated[list[str], typer.Argument(show_default="current directory",
+        help="Directories and source files to extract from. A single directory is walked as the base directory.")] = None,
     verbose: Annotated[bool, typer.Option(
         help="Print each file extracted from and every file or directory created or deleted.")] = False,
     prune: Annotated[bool, typer.Option(
         help="Delete any extracted [bold].listing[/bold] files that no longer correspond to a declared listing in the source files.")] = False,
+    cache: Annotated[bool, typer.Option(
+        help="Skip source files that are unchanged since the last extraction, as recorded in [bold].listloc-cache[/bold].")] = True,
+    jobs: Annotated[int, typer.Option(
+        min=1, help="Number of source files to read and parse concurrently.")] = 1,
+    engine: Annotated[ExtractionEngine, typer.Option(
+        help="How source files are scanned. [bold]thread[/bold] and [bold]process[/bold] choose the worker pool used when [bold]--jobs[/bold] is greater than 1, where [bold]process[/bold] suits CPU-heavy parsing. [bold]async[/bold] overlaps walking, reading and writing even with [bold]--jobs 1[/bold], which helps on high-latency file systems such as NFS.")] = ExtractionEngine.THREAD,
+    exclude: Annotated[list[str], typer.Option(
+        help="Glob matched against file and directory names and paths relative to the given directory. Matching paths are skipped. Can be repeated.")] = None,
+    ignore_files: Annotated[bool, typer.Option(
+        help="Skip paths ignored by [bold].gitignore[/bold] and [bold].listlocignore[/bold] files.")] = True,
+    fsync: Annotated[bool, typer.Option(
+        help="Make the written listing files durable before exiting, moving them into place only once their data is on disk, with one syncfs per file system and one fsync per [bold]listings/[/bold] directory.")] = False,
+    output_format: Annotated[OutputFormat, typer.Option("--format",
+        help="Write one [bold].listing[/bold] file per listing, or every listing into a single [bold]listings.bundle[/bold] file in the given directory.")] = OutputFormat.FILES,
+    stats: Annotated[bool, typer.Option(
+        help="Print the time spent in each phase of the extraction, and counts of the files and listings processed.")] = False,
+    stats_output: Annotated[str, typer.Option(
+        help="File to write the phase times and counts to as JSON.")] = None,
+    profile: Annotated[str, typer.Option(
+        help="File to write a cProfile profile of the extraction to, for inspection with [bold]pstats[/bold] or [bold]snakeviz[/bold].")] = None,
+    index: Annotated[bool, typer.Option(
+        help="Keep an [bold]index.json[/bold] file in every [bold]listings/[/bold] directory that maps each listing to its source file, line range and content hash.")] = False,
+    output: Annotated[LogOutput, typer.Option(
+        help="Print every action as a JSON event followed by a summary, either as one JSON document or one event per line, instead of text.")] = LogOutput.TEXT,
+    files_from: Annotated[str, typer.Option(
+        help="File listing further paths to extract from, one per line, such as the output of [bold]git diff --name-only[/bold]. Use [bold]-[/bold] to read standard input.")] = None,
+    base: Annotated[str, typer.Option(
+        show_default="current directory",
+        help="Base directory holding the scan manifest and ignore rules when extracting from several paths, individual files or [bold]--files-from[/bold].")] = None,
+    begin_marker: Annotated[list[str], typer.Option(
+        help="Marker that begins a listing instead of [cyan]BEGIN LISTING[/cyan], e.g. [cyan]@listing-start[/cyan]. Paired with the [bold]--end-marker[/bold] at the same position and can be repeated. Replaces the markers configured in [bold]pyproject.toml[/bold].")] = None,
+    end_marker: Annotated[list[str], typer.Option(
+        help="Marker that ends a listing begun by the [bold]--begin-marker[/bold] at the same position. Can be repeated.")] = None,
+    comment_prefix: Annotated[list[str], typer.Option(
+        help="Only recognize listing statements on comment lines in files with the given extension, given as [bold]EXTENSION=PREFIX[/bold] (e.g. [bold].py=#[/bold]). Can be repeated.")] = None,
     ):
     """
     Recursively extract all declared code listings from UTF-8 encoded source files under the given directory.
 
     Each code listing includes the lines between [cyan]BEGIN LISTING <listing_name>[/cyan] and [cyan]END LISTING[/cyan], with any leading or trailing blank lines automatically removed. Extracted listings are saved as [bold].listing[/bold] files inside [bold]listings/[/bold] directories.
 
-    If no directory path is provided, the current working directory is used.
+    Source files that are unchanged since the last run are skipped, using the scan manifest [bold].listloc-cache[/bold] stored in the given directory. Use [bold]--no-cache[/bold] to rescan every file.
+
+    The markers and comment rules can also be configured in the [bold][tool.listloc][/bold] table of a [bold]pyproject.toml[/bold] file in the base directory.
+
+    Several paths, individual source files and the paths listed by [bold]--files-from[/bold] are extracted from without walking the rest of the base directory. The path arguments must exist, while listings of deleted source files listed by [bold]--files-from[/bold] are removed, and [bold]--prune[/bold] only prunes the [bold]listings/[/bold] directories next to and under them.
+
+    If no path is provided, the base directory is used, which is the current working directory unless [bold]--base[/bold] is given.
 
     Example: 
         listloc extract ./my_project
+
+        git diff --name-only | listloc extract --files-from - --prune
     """
-    extractor, logger = create_extractor(path, verbose)
-    if prune:
-        extractor.clear_all_listing_extractions()
-    extractor.extract_all_listings()
+    paths = list(paths or [])
+    # Without any paths, the base directory is walked, whether or not it is given with --base
+    walk_base_directory = files_from is None and (not paths or (base is None and len(paths) == 1 and not os.path.isfile(paths[0])))
+    if not walk_base_directory:
+        # Only the paths listed by --files-from may name deleted source files
+        for missing_path in (path for path in paths if not os.path.exists(path)):
+            raise FileNotFoundError(f"Expected a file or directory path, but got: '{missing_path}'")
+    if files_from is not None:
+        paths.extend(read_path_list(files_from))
+    if walk_base_directory:
+        path = paths[0] if paths else base or os.getcwd()
+    else:
+        path = base or os.getcwd()
+    syntax = load_syntax(path, begin_marker, end_marker, comment_prefix)
+    extraction_stats = ExtractionStats() if stats or stats_output else None
+    extractor, logger = create_extractor(path, verbose, use_cache=cache, jobs=jobs, engine=engine, exclude=exclude, ignore_files=ignore_files, fsync=fsync, output_format=output_format, stats=extraction_stats, output=output, index=index, syntax=syntax)
+    if walk_base_directory:
+        run_profiled(lambda: extractor.extract_all_listings(prune=prune), profile)
+    else:
+        run_profiled(lambda: extractor.extract_listings(paths, prune=prune), profile)
     logger.summarize_or_note_no_extractions()
+    if extraction_stats is not None:
+        extraction_stats.stop()
+        if stats:
+            # The report goes to standard error with JSON output, so that standard output stays parseable
+            typer.echo("\n".join(extraction_stats.report_lines()), err=output != LogOutput.TEXT)
+        if stats_output:
+            extraction_stats.write_json(stats_output)
 
 
 @app.command()
-def clear(path: Annotated[str, typer.Argument()] = os.getcwd(),
+def clear(path: Annotated[str, typer.Argument(default_factory=os.getcwd, show_default="current directory")],
           verbose: Annotated[bool, typer.Option(
-              help="Print every deleted file and directory")] = False):
+              help="Print every deleted file and directory")] = False,
+          exclude: Annotated[list[str], typer.Option(
+              help="Glob matched against directory names and paths relative to the given directory. Matching directories are skipped. Can be repeated.")] = None,
+          ignore_files: Annotated[bool, typer.Option(
+              help="Skip directories ignored by [bold].gitignore[/bold] and [bold].listlocignore[/bold] files.")] = True,
+          output: Annotated[LogOutput, typer.Option(
+              help="Print every deletion as a JSON event followed by a summary, either as one JSON document or one event per line, instead of text.")] = LogOutput.TEXT):
     """
     Recursively delete all extracted [bold].listing[/bold] files under the given directory.
 
     Every [bold]listings/[/bold] directory left empty after the deletions will also be removed.
 
-    If no path is provided, the current working directory is used.
+    If no path is provided, the base directory is used, which is the current working directory unless [bold]--base[/bold] is given.
 
     Example: 
         listloc clear ./my_project
     """
-    extractor, logger = create_extractor(path, verbose)
+    extractor, logger = create_extractor(path, verbose, exclude=exclude, ignore_files=ignore_files, output=output)
     extractor.clear_all_listing_extractions()
     logger.summarize_or_note_no_clearings()
 
+def open_bundle(path: str):
+    bundle_path = os.path.join(path, ListingConstants.BUNDLE_FILE_NAME)
+    if not os.path.isfile(bundle_path):
+        raise FileNotFoundError(f"No listing bundle in '{path}', run 'listloc extract --format bundle' first")
+    return ListingBundle(bundle_path)
+
+@app.command()
+def get(name: Annotated[str, typer.Argument(help="Name of the listing, or its key if the name is ambiguous (e.g. [bold]docs/greet[/bold]).")],
+        path: Annotated[str, typer.Argument(default_factory=os.getcwd, show_default="current directory")]):
+    """
+    Print the content of one listing from the [bold]listings.bundle[/bold] file in the given directory.
+
+    If no directory path is provided, the current working directory is used.
+
+    Example: 
+        listloc get greet ./my_project
+    """
+    bundle = open_bundle(path)
+    typer.echo(bundle.read(bundle.find(name)))
+
+@app.command()
+def export(path: Annotated[str, typer.Argument(default_factory=os.getcwd, show_default="current directory")],
+           output: Annotated[str, typer.Option(
+               help="File to write the LaTeX source to. Printed to standard output if omitted.")] = None):
+    """
+    Export every listing in the [bold]listings.bundle[/bold] file in the given directory as LaTeX source.
+
+    The source consists of one [cyan]filecontents*[/cyan] environment per listing, which writes the listing to its own file when the document is compiled. Each file is named after the listing key with every [bold]/[/bold] replaced by [bold]-[/bold], e.g. [bold]docs-greet.listing[/bold].
+
+    If no directory path is provided, the current working directory is used.
+
+    Example: 
+        listloc export ./my_project --output listings.tex
+    """
+    latex = open_bundle(path).to_latex()
+    if output is None:
+        typer.echo(latex, nl=False)
+        return
+    with open(output, "wt", encoding="utf-8") as f:
+        f.write(latex)
+
+@app.command()
+def watch(path: Annotated[str, typer.Argument(default_factory=os.getcwd, show_default="current directory")],
+          verbose: Annotated[bool, typer.Option(
+              help="Print each file extracted from and every file or directory created or deleted.")] = False,
+          exclude: Annotated[list[str], typer.Option(
+              help="Glob matched against file and directory names and paths relative to the given directory. Matching paths are skipped. Can be repeated.")] = None,
+          ignore_files: Annotated[bool, typer.Option(
+              help="Skip paths ignored by [bold].gitignore[/bold] and [bold].listlocignore[/bold] files.")] = True,
+          poll: Annotated[bool, typer.Option(
+              help="Detect changes by polling file modification times instead of using inotify.")] = False,
+          interval: Annotated[float, typer.Option(
+              min=0.01, help="Seconds between polls when polling.")] = 1.0,
+          debounce: Annotated[float, typer.Option(
+              min=0.0, help="Seconds without further changes to wait for before re-extracting, so that bursts of editor writes are handled together.")] = 0.2):
+    """
+    Extract all declared code listings under the given directory, then keep re-extracting the source files that change.
+
+    Listings are declared with the markers and comment rules configured in the [bold]pyproject.toml[/bold] file of the given directory, if any. Only source files that are changed, created or deleted are read again. Listings of deleted source files and of removed listing declarations are deleted. Changes are detected with inotify on Linux, and by polling file modification times elsewhere.
+
+    If no directory path is provided, the current working directory is used.
+
+    Example: 
+        listloc watch ./my_project
+    """
+    # Imported here so that the other commands never load ctypes and select for inotify
+    from listloc.extractor.listing_watcher import ListingWatcher
+    watcher = ListingWatcher(path, verbose=verbose, exclude_patterns=exclude or (), use_ignore_files=ignore_files, use_polling=poll, interval=interval, debounce=debounce, syntax=load_syntax(path))
+    typer.echo(f"Watching '{path}' for changes. Press Ctrl+C to stop.")
+    try:
+        watcher.watch()
+    except KeyboardInterrupt:
+        pass
+
 if __name__ == "__main__":
     app()
\ No newline at end of file
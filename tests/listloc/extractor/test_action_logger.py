@@ -0,0 +1,43 @@
+import unittest
+import io
+import json
+from contextlib import redirect_stdout
+from src.listloc.extractor.action_logger import ActionLogger, PathLogger, LogOutput
+
+class TestPathLogger(unittest.TestCase):
+
+    def test_counts_paths_by_kind(self):
+        path_logger = PathLogger()
+        path_logger.log_path("listings")
+        path_logger.log_path("listings/foo.listing")
+        path_logger.log_path("listings/bar.listing")
+        self.assertEqual(3, path_logger.number_of_paths())
+        self.assertEqual(2, path_logger.number_of_listing_files())
+
+
+class TestActionLogger(unittest.TestCase):
+
+    def test_ndjson_output_prints_one_event_per_line(self):
+        logger = ActionLogger("base", verbose=True, output=LogOutput.NDJSON)
+        with redirect_stdout(io.StringIO()) as stdout:
+            logger.log_extracted("base/source.py", 1)
+            logger.log_written_file("base/listings/foo.listing")
+            logger.summarize_or_note_no_extractions()
+        events = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual({"event": "extracted", "source": "base/source.py", "listings": 1}, events[0])
+        self.assertEqual({"event": "written", "path": "base/listings/foo.listing"}, events[1])
+        self.assertEqual("summary", events[2]["event"])
+        self.assertEqual(1, events[2]["extracted_listings"])
+
+    def test_json_output_prints_one_document(self):
+        logger = ActionLogger("base", output=LogOutput.JSON)
+        with redirect_stdout(io.StringIO()) as stdout:
+            logger.log_deleted_file("base/listings/foo.listing")
+            logger.log_removed_directory("base/listings")
+            logger.summarize_or_note_no_clearings()
+        document = json.loads(stdout.getvalue())
+        self.assertEqual(["deleted", "removed"], [event["event"] for event in document["events"]])
+        self.assertEqual(1, document["summary"]["deleted_listings"])
+
+if __name__ == "__main__":
+    unittest.main()
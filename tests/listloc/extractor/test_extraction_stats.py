@@ -0,0 +1,48 @@
+import unittest
+from src.listloc.extractor.extraction_stats import ExtractionStats
+from src.listloc.extractor.source_scanner import SourceScan
+
+class TestExtractionStats(unittest.TestCase):
+
+    def test_phase_adds_time(self):
+        stats = ExtractionStats()
+        with stats.phase("write"):
+            pass
+        self.assertGreater(stats.to_dict()["phase_times_s"]["write"], 0.0)
+
+    def test_timed_iteration_yields_every_item(self):
+        stats = ExtractionStats()
+        self.assertEqual([1, 2, 3], list(stats.timed_iteration("walk", [1, 2, 3])))
+        self.assertGreater(stats.to_dict()["phase_times_s"]["walk"], 0.0)
+
+    def test_record_scan_counts_by_outcome(self):
+        stats = ExtractionStats()
+        parsed_scan = self.__scan(is_text=True, bytes_read=10)
+        parsed_scan.phase_times = {"parse": 0.5}
+        stats.record_scan(parsed_scan)
+        stats.record_scan(self.__scan(is_text=False, bytes_read=20))
+        skipped_scan = self.__scan(is_text=False, bytes_read=0)
+        skipped_scan.unchanged = True
+        stats.record_scan(skipped_scan)
+        report = stats.to_dict()
+        self.assertEqual(0.5, report["phase_times_s"]["parse"])
+        self.assertEqual(3, report["counts"]["source_files"])
+        self.assertEqual(1, report["counts"]["files_parsed"])
+        self.assertEqual(1, report["counts"]["binary_files"])
+        self.assertEqual(1, report["counts"]["files_skipped"])
+        self.assertEqual(30, report["counts"]["bytes_read"])
+
+    def test_stop_freezes_total_time(self):
+        stats = ExtractionStats()
+        stats.stop()
+        self.assertEqual(stats.total_time, stats.to_dict()["total_time_s"])
+
+    @staticmethod
+    def __scan(is_text, bytes_read):
+        scan = SourceScan("file")
+        scan.is_text = is_text
+        scan.bytes_read = bytes_read
+        return scan
+
+if __name__ == "__main__":
+    unittest.main()
@@ -63,6 +63,46 @@ print('hello')
         actual_listing_strings = self.__extract_listing_file_contents()
         self.assertEqual(self.__EXPECTED_LISTING_STRINGS, actual_listing_strings)
 
+    def test_extract_listings_spanning_read_chunks(self):
+        path = os.path.join(self.__BASE_DIRECTORY_PATH, "large_code.py")
+        long_line = "x" * 100000
+        self.__create_code_file(path, f"{long_line}\r\n# BEGIN LISTING long\r\n{long_line}\r\n\r\n{long_line}\r\n# END LISTING\r\n{long_line}")
+        FileExtractor(path, self.__logger).extract_listings()
+        expected_listing_strings = {f"long{ListingConstants.LISTING_FILE_EXTENSION}": f"{long_line}\n\n{long_line}"}
+        self.assertEqual(expected_listing_strings, self.__extract_listing_file_contents())
+
+    def test_extract_listings_from_memory_mapped_file(self):
+        path = os.path.join(self.__BASE_DIRECTORY_PATH, "huge_code.py")
+        filler = "# filler\n" * 300000
+        self.__create_code_file(path, filler + self.__EXAMPLE_CODE + filler)
+        FileExtractor(path, self.__logger).extract_listings()
+        self.assertEqual(self.__EXPECTED_LISTING_STRINGS, self.__extract_listing_file_contents())
+
+    def test_files_without_begin_statement_are_not_decoded(self):
+        path = os.path.join(self.__BASE_DIRECTORY_PATH, "mostly_text.txt")
+        with open(path, "wb") as f:
+            f.write(b"plain text\n" * 1000 + b"\xff\xfe")
+        FileExtractor(path, self.__logger).extract_listings()
+        self.assertFalse(os.path.isdir(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME)))
+
+    def test_unchanged_listing_files_are_not_rewritten(self):
+        path = os.path.join(self.__BASE_DIRECTORY_PATH, "temp_code.py")
+        self.__create_code_file(path, self.__EXAMPLE_CODE)
+        FileExtractor(path, self.__logger).extract_listings()
+        listing_path = os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME, f"import{ListingConstants.LISTING_FILE_EXTENSION}")
+        os.utime(listing_path, ns=(0, 0))
+        FileExtractor(path, self.__logger).extract_listings()
+        self.assertEqual(0, os.stat(listing_path).st_mtime_ns)
+        self.assertEqual(self.__EXPECTED_LISTING_STRINGS, self.__extract_listing_file_contents())
+
+    def test_changed_listing_files_are_updated(self):
+        path = os.path.join(self.__BASE_DIRECTORY_PATH, "temp_code.py")
+        self.__create_code_file(path, self.__EXAMPLE_CODE)
+        FileExtractor(path, self.__logger).extract_listings()
+        self.__create_code_file(path, self.__EXAMPLE_CODE.replace("import os", "import sys"))
+        FileExtractor(path, self.__logger).extract_listings()
+        self.assertEqual("import sys", self.__extract_listing_file_contents()[f"import{ListingConstants.LISTING_FILE_EXTENSION}"])
+
     def test_raise_when_invalid_declaration(self):
         path = os.path.join(self.__BASE_DIRECTORY_PATH, "invalid_source_file.py")
         self.__create_code_file(path, self.__INVALID_LISTING_DECLARATION)
@@ -71,7 +111,7 @@ print('hello')
         self.assertRaisesRegex(Exception, expected_message, extractor.extract_listings) 
 
     def __create_code_file(self, path, code_file_content):
-        with open(path, "wt", encoding="utf-8") as f:
+        with open(path, "wt", encoding="utf-8", newline="") as f:
             f.write(code_file_content)
 
     def __extract_listing_file_contents(self):
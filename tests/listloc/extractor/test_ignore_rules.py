@@ -0,0 +1,46 @@
+import unittest
+import os
+import tempfile
+from src.listloc.extractor.ignore_rules import IgnoreRules, IgnoreRulesTree
+
+class TestIgnoreRules(unittest.TestCase):
+
+    def test_unanchored_patterns(self):
+        rules = IgnoreRules(["# comment", "", "*.aux", "build/"])
+        self.assertTrue(rules.match("main.aux", is_directory=False))
+        self.assertTrue(rules.match("chapters/intro.aux", is_directory=False))
+        self.assertTrue(rules.match("docs/build", is_directory=True))
+        self.assertIsNone(rules.match("docs/build", is_directory=False))
+        self.assertIsNone(rules.match("main.tex", is_directory=False))
+
+    def test_anchored_patterns(self):
+        rules = IgnoreRules(["/out", "docs/*.pdf", "**/cache", "vendor/**"])
+        self.assertTrue(rules.match("out", is_directory=True))
+        self.assertIsNone(rules.match("src/out", is_directory=True))
+        self.assertTrue(rules.match("docs/manual.pdf", is_directory=False))
+        self.assertIsNone(rules.match("docs/sub/manual.pdf", is_directory=False))
+        self.assertTrue(rules.match("a/b/cache", is_directory=True))
+        self.assertTrue(rules.match("vendor/lib/file.py", is_directory=False))
+
+    def test_last_matching_pattern_wins(self):
+        rules = IgnoreRules(["*.log", "!keep.log", "\\!bang"])
+        self.assertTrue(rules.match("debug.log", is_directory=False))
+        self.assertFalse(rules.match("keep.log", is_directory=False))
+        self.assertTrue(rules.match("!bang", is_directory=False))
+
+    def test_deeper_ignore_files_take_precedence(self):
+        with tempfile.TemporaryDirectory() as base_directory_path:
+            sub_directory_path = os.path.join(base_directory_path, "sub")
+            os.mkdir(sub_directory_path)
+            with open(os.path.join(base_directory_path, ".gitignore"), "wt") as f:
+                f.write("*.txt\n")
+            with open(os.path.join(sub_directory_path, ".listlocignore"), "wt") as f:
+                f.write("!notes.txt\n")
+            tree = IgnoreRulesTree(base_directory_path, (".gitignore", ".listlocignore"))
+            self.assertTrue(tree.ignores(os.path.join(base_directory_path, "notes.txt"), is_directory=False))
+            self.assertFalse(tree.ignores(os.path.join(sub_directory_path, "notes.txt"), is_directory=False))
+            self.assertTrue(tree.ignores(os.path.join(sub_directory_path, "other.txt"), is_directory=False))
+            self.assertFalse(tree.ignores(os.path.join(sub_directory_path, "main.py"), is_directory=False))
+
+if __name__ == "__main__":
+    unittest.main()
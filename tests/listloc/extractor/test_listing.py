@@ -34,6 +34,24 @@ class TestListing(unittest.TestCase):
         for i in range(len(listing_strings)):
             self.__assert_correct_content(listing_strings[i], expected_content_strings[i])
 
+    def test_content_with_many_surrounding_empty_lines(self):
+        blank_lines = "\n  " * 50000
+        listing = Listing(f"BEGIN LISTING name{blank_lines}\ncode\n  more code{blank_lines}\nEND LISTING")
+        self.assertEqual("code\n  more code", listing.content)
+
+    def test_line_range(self):
+        self.assertIsNone(Listing("BEGIN LISTING name\ncode\nEND LISTING").line_range)
+        self.assertEqual((3, 6), Listing("BEGIN LISTING name\r\n\rcode\nEND LISTING", first_line=3).line_range)
+
+    def test_from_lines(self):
+        listing_lines = ["BEGIN LISTING name", "", "code\x0cwith form feed", "", "END LISTING"]
+        listing = Listing.from_lines(list(listing_lines), first_line=3)
+        self.assertEqual("name", listing.name)
+        self.assertEqual("code\x0cwith form feed", listing.content)
+        self.assertEqual((3, 7), listing.line_range)
+        self.assertEqual(listing.content, Listing("\r\n".join(listing_lines)).content)
+        self.assertRaises(ListingError, Listing.from_lines, [])
+
     def __assert_correct_content(self, listing_string, expected_content):
         actual_content = Listing(listing_string).content
         self.assertEqual(expected_content, actual_content)
@@ -0,0 +1,55 @@
+import unittest
+import os
+import tempfile
+from src.listloc.extractor.listing_bundle import ListingBundle
+from src.listloc.extractor.listing_writer import ListingWriter
+
+class TestListingBundle(unittest.TestCase):
+    __ENTRIES = [
+        ("greet", "example.py", "print('hello')"),
+        ("docs/greet", os.path.join("docs", "example.py"), "print('hej')"),
+        ("docs/unicode", os.path.join("docs", "example.py"), "print('blåbær')"),
+    ]
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__BUNDLE_PATH = os.path.join(self.__temp_dir.name, "listings.bundle")
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_read(self):
+        self.assertTrue(ListingBundle.write(self.__BUNDLE_PATH, self.__ENTRIES, ListingWriter()))
+        bundle = ListingBundle(self.__BUNDLE_PATH)
+        self.assertEqual(["greet", "docs/greet", "docs/unicode"], bundle.keys())
+        for key, source_path, content in self.__ENTRIES:
+            self.assertEqual(content, bundle.read(key))
+
+    def test_identical_bundle_is_not_rewritten(self):
+        ListingBundle.write(self.__BUNDLE_PATH, self.__ENTRIES, ListingWriter())
+        self.assertFalse(ListingBundle.write(self.__BUNDLE_PATH, self.__ENTRIES, ListingWriter()))
+
+    def test_find(self):
+        ListingBundle.write(self.__BUNDLE_PATH, self.__ENTRIES, ListingWriter())
+        bundle = ListingBundle(self.__BUNDLE_PATH)
+        self.assertEqual("docs/unicode", bundle.find("unicode"))
+        self.assertEqual("docs/greet", bundle.find("docs/greet"))
+        self.assertRaisesRegex(Exception, "No listing named 'missing'", bundle.find, "missing")
+
+    def test_find_ambiguous_name(self):
+        entries = [("a/greet", "a/x.py", "1"), ("b/greet", "b/x.py", "2")]
+        ListingBundle.write(self.__BUNDLE_PATH, entries, ListingWriter())
+        self.assertRaisesRegex(Exception, "ambiguous", ListingBundle(self.__BUNDLE_PATH).find, "greet")
+
+    def test_to_latex(self):
+        ListingBundle.write(self.__BUNDLE_PATH, self.__ENTRIES[:2], ListingWriter())
+        expected_latex = "\\begin{filecontents*}[overwrite]{greet.listing}\nprint('hello')\n\\end{filecontents*}\n\\begin{filecontents*}[overwrite]{docs-greet.listing}\nprint('hej')\n\\end{filecontents*}\n"
+        self.assertEqual(expected_latex, ListingBundle(self.__BUNDLE_PATH).to_latex())
+
+    def test_not_a_bundle(self):
+        with open(self.__BUNDLE_PATH, "wb") as f:
+            f.write(b"something else")
+        self.assertRaisesRegex(Exception, "is not a listing bundle", ListingBundle, self.__BUNDLE_PATH)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,12 @@
 import unittest
 import os
-from src.listloc.extractor.listing_extractor import ListingExtractor, FileExtractor
+import io
+import json
+from contextlib import redirect_stdout
+from src.listloc.extractor.listing_extractor import ListingExtractor, FileExtractor, ExtractionEngine
 from src.listloc.extractor.listing_constants import ListingConstants
-from src.listloc.extractor.action_logger import ActionLogger
+from src.listloc.extractor.action_logger import ActionLogger, LogOutput
+from src.listloc.extractor.extraction_stats import ExtractionStats
 import tempfile
 
 class TestListingExtractor(unittest.TestCase):
@@ -68,6 +72,165 @@ class TestListingExtractor(unittest.TestCase):
         listing_directory_in_empty_dir = os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir3", ListingConstants.LISTING_DIRECTORY_NAME)
         self.assertFalse(os.path.isdir(listing_directory_in_empty_dir))
     
+    def test_extract_skips_excluded_directories(self):
+        self.__create_subdirs_and_code_files()
+        for excluded_directory in [".git", os.path.join("dir1", "node_modules")]:
+            os.mkdir(os.path.join(self.__BASE_DIRECTORY_PATH, excluded_directory))
+            with open(os.path.join(self.__BASE_DIRECTORY_PATH, excluded_directory, "file1"), "wt", encoding="utf-8") as f:
+                f.write(self.__create_listing_string("excluded_listing"))
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, exclude_patterns=["dir4"]).extract_all_listings()
+        self.assertFalse(os.path.isdir(os.path.join(self.__BASE_DIRECTORY_PATH, ".git", ListingConstants.LISTING_DIRECTORY_NAME)))
+        self.assertFalse(os.path.isdir(os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "node_modules", ListingConstants.LISTING_DIRECTORY_NAME)))
+        self.assertFalse(os.path.isdir(os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir3", "dir4", ListingConstants.LISTING_DIRECTORY_NAME)))
+        self.assertTrue(os.path.isdir(os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", ListingConstants.LISTING_DIRECTORY_NAME)))
+
+    def test_extract_honors_ignore_files(self):
+        self.__create_subdirs_and_code_files()
+        with open(os.path.join(self.__BASE_DIRECTORY_PATH, ".gitignore"), "wt") as f:
+            f.write("dir2/\n")
+        with open(os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", ".listlocignore"), "wt") as f:
+            f.write("file1\n")
+        self.__listing_extractor.extract_all_listings()
+        self.assertFalse(os.path.exists(os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir2", ListingConstants.LISTING_DIRECTORY_NAME, f"file2_listing{ListingConstants.LISTING_FILE_EXTENSION}")))
+        self.assertFalse(os.path.isdir(os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", ListingConstants.LISTING_DIRECTORY_NAME)))
+        self.assertTrue(os.path.exists(os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir3", "dir4", ListingConstants.LISTING_DIRECTORY_NAME, f"file2_listing{ListingConstants.LISTING_FILE_EXTENSION}")))
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, use_cache=False, use_ignore_files=False).extract_all_listings()
+        for file_path in self.__LISTING_FILES_THAT_SHOULD_BE_CREATED:
+            self.assertTrue(os.path.exists(file_path))
+
+    def test_extract_all_listings_on_worker_pools(self):
+        self.__create_subdirs_and_code_files()
+        for engine in ExtractionEngine:
+            ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, use_cache=False, jobs=4, engine=engine).extract_all_listings()
+            for file_path in self.__LISTING_FILES_THAT_SHOULD_BE_CREATED:
+                self.assertTrue(os.path.exists(file_path))
+            self.__listing_extractor.clear_all_listing_extractions()
+
+    def test_worker_pool_raises_same_error_as_serial_run(self):
+        self.__create_subdirs_and_code_files()
+        invalid_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir2", "file1")
+        with open(invalid_file_path, "wt", encoding="utf-8") as f:
+            f.write("BEGIN LISTING too many names\ncode\nEND LISTING")
+        expected_message = f"In file '{invalid_file_path}': The begin statement"
+        for jobs, engine in [(1, ExtractionEngine.THREAD), (4, ExtractionEngine.THREAD), (4, ExtractionEngine.ASYNC)]:
+            extractor = ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, use_cache=False, jobs=jobs, engine=engine)
+            self.assertRaisesRegex(Exception, expected_message, extractor.extract_all_listings)
+
+    def test_async_engine_logs_same_events_as_serial_run(self):
+        self.__create_subdirs_and_code_files()
+        events_by_engine = []
+        for jobs, engine in [(1, ExtractionEngine.THREAD), (4, ExtractionEngine.ASYNC)]:
+            logger = ActionLogger(self.__BASE_DIRECTORY_PATH, output=LogOutput.NDJSON)
+            with redirect_stdout(io.StringIO()) as stdout:
+                ListingExtractor(self.__BASE_DIRECTORY_PATH, logger, jobs=jobs, engine=engine).extract_all_listings()
+                logger.summarize_or_note_no_extractions()
+            events_by_engine.append(stdout.getvalue())
+            self.__listing_extractor.clear_all_listing_extractions()
+        self.assertEqual(events_by_engine[0], events_by_engine[1])
+
+    def test_extract_rewrites_edited_source_file_only(self):
+        self.__create_subdirs_and_code_files()
+        self.__listing_extractor.extract_all_listings()
+        edited_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "file1")
+        with open(edited_file_path, "wt", encoding="utf-8") as f:
+            f.write(self.__create_listing_string("renamed_listing"))
+        logger = ActionLogger(self.__BASE_DIRECTORY_PATH, verbose=True)
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, logger).extract_all_listings()
+        listing_directory = os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", ListingConstants.LISTING_DIRECTORY_NAME)
+        self.assertEqual([f"renamed_listing{ListingConstants.LISTING_FILE_EXTENSION}"], os.listdir(listing_directory))
+        for file_path in self.__LISTING_FILES_THAT_SHOULD_BE_CREATED:
+            if os.path.dirname(file_path) != listing_directory:
+                self.assertTrue(os.path.exists(file_path))
+
+    def test_extract_all_listings_collects_stats(self):
+        self.__create_subdirs_and_code_files()
+        stats = ExtractionStats()
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, stats=stats).extract_all_listings()
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, use_cache=False, stats=stats).extract_all_listings()
+        report = stats.to_dict()
+        self.assertEqual(len(self.__FILES) * 2, report["counts"]["source_files"])
+        self.assertEqual(len(self.__FILES) * 2, report["counts"]["files_parsed"] + report["counts"]["files_from_parse_cache"])
+        self.assertEqual(len(self.__LISTING_FILES_THAT_SHOULD_BE_CREATED), report["counts"]["listings_written"])
+        self.assertEqual(len(self.__LISTING_FILES_THAT_SHOULD_BE_CREATED), report["counts"]["listings_unchanged"])
+        self.assertGreater(report["phase_times_s"]["parse"], 0.0)
+        self.assertGreater(report["phase_times_s"]["listing_construction"], 0.0)
+
+    def test_extract_all_listings_with_index(self):
+        self.__create_subdirs_and_code_files()
+        index_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir2", ListingConstants.LISTING_DIRECTORY_NAME, ListingConstants.INDEX_FILE_NAME)
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger).extract_all_listings()
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, write_index=True).extract_all_listings()
+        with open(index_file_path, "rt", encoding="utf-8") as f:
+            entries = json.load(f)["listings"]
+        self.assertEqual({"source": "file2", "first_line": 1, "last_line": 3}, {key: value for key, value in entries["file2_listing"].items() if key != "sha256"})
+        self.assertEqual(["file1_listing", "file2_listing"], sorted(entries))
+        os.remove(os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir2", "file2"))
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, write_index=True).extract_all_listings()
+        with open(index_file_path, "rt", encoding="utf-8") as f:
+            self.assertEqual(["file1_listing"], sorted(json.load(f)["listings"]))
+        self.__listing_extractor.clear_all_listing_extractions()
+        self.assertFalse(os.path.exists(index_file_path))
+        for directory_path in self.__listing_directories_that_should_be_deleted_after_clearing():
+            self.assertFalse(os.path.isdir(directory_path))
+
+    def test_extract_all_listings_without_index_updates_existing_index(self):
+        self.__create_subdirs_and_code_files()
+        index_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir2", ListingConstants.LISTING_DIRECTORY_NAME, ListingConstants.INDEX_FILE_NAME)
+        other_index_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", ListingConstants.LISTING_DIRECTORY_NAME, ListingConstants.INDEX_FILE_NAME)
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, write_index=True).extract_all_listings()
+        os.remove(other_index_file_path)
+        os.remove(os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir2", "file2"))
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger).extract_all_listings()
+        with open(index_file_path, "rt", encoding="utf-8") as f:
+            self.assertEqual(["file1_listing"], sorted(json.load(f)["listings"]))
+        self.assertFalse(os.path.exists(other_index_file_path))
+
+    def test_listing_still_declared_by_other_source_is_kept(self):
+        listing_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME, "foo" + ListingConstants.LISTING_FILE_EXTENSION)
+        for name in ("a.txt", "b.txt"):
+            with open(os.path.join(self.__BASE_DIRECTORY_PATH, name), "wt", encoding="utf-8") as f:
+                f.write("BEGIN LISTING foo\ncode\nEND LISTING\n")
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger).extract_all_listings()
+        with open(os.path.join(self.__BASE_DIRECTORY_PATH, "a.txt"), "wt", encoding="utf-8") as f:
+            f.write("no listings left\n")
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger).extract_all_listings()
+        self.assertTrue(os.path.isfile(listing_file_path))
+        os.remove(os.path.join(self.__BASE_DIRECTORY_PATH, "b.txt"))
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger).extract_all_listings()
+        self.assertFalse(os.path.exists(os.path.dirname(listing_file_path)))
+
+    def test_copies_of_source_file_are_parsed_once(self):
+        self.__create_subdirs_and_code_files()
+        stats = ExtractionStats()
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger, stats=stats).extract_all_listings()
+        # The source files named file1 and file2 are copies of each other
+        self.assertEqual(2, stats.to_dict()["counts"]["files_parsed"])
+        self.assertEqual(len(self.__FILES) - 2, stats.to_dict()["counts"]["files_from_parse_cache"])
+        for file_path in self.__LISTING_FILES_THAT_SHOULD_BE_CREATED:
+            self.assertTrue(os.path.exists(file_path))
+
+    def test_extract_listings_of_given_paths(self):
+        self.__create_subdirs_and_code_files()
+        self.__listing_extractor.extract_listings([os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "file1"), os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir3")])
+        for file_path in self.__LISTING_FILES_THAT_SHOULD_BE_CREATED:
+            relative_path = os.path.relpath(file_path, self.__BASE_DIRECTORY_PATH)
+            self.assertEqual(relative_path.startswith("dir1" + os.sep) and not relative_path.startswith(os.path.join("dir1", "dir2")), os.path.exists(file_path))
+        self.assertRaises(ValueError, self.__listing_extractor.extract_listings, [os.path.dirname(self.__BASE_DIRECTORY_PATH)])
+
+    def test_extract_listings_removes_and_prunes_within_given_paths_only(self):
+        self.__create_subdirs_and_code_files()
+        self.__listing_extractor.extract_all_listings()
+        for file in [os.path.join("dir1", "dir2", "file2"), os.path.join("dir1", "dir3", "dir4", "file2")]:
+            os.remove(os.path.join(self.__BASE_DIRECTORY_PATH, file))
+        stale_listing_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir2", ListingConstants.LISTING_DIRECTORY_NAME, f"stale{ListingConstants.LISTING_FILE_EXTENSION}")
+        with open(stale_listing_file_path, "wt", encoding="utf-8") as f:
+            f.write("stale")
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, self.__logger).extract_listings([os.path.join(self.__BASE_DIRECTORY_PATH, "dir1", "dir2", "file2")], prune=True)
+        self.assertFalse(os.path.exists(self.__LISTING_FILES_THAT_SHOULD_BE_CREATED[3]))
+        self.assertFalse(os.path.exists(stale_listing_file_path))
+        self.assertTrue(os.path.exists(self.__LISTING_FILES_THAT_SHOULD_BE_CREATED[2]))
+        self.assertTrue(os.path.exists(self.__LISTING_FILES_THAT_SHOULD_BE_CREATED[5]))
+
     def test_clear_all_listing_extractions(self):
         self.__create_subdirs_and_code_files()
         self.__listing_extractor.extract_all_listings()
@@ -0,0 +1,55 @@
+import unittest
+import os
+import json
+import tempfile
+from src.listloc.extractor.listing_index import ListingIndex
+from src.listloc.extractor.listing import Listing
+from src.listloc.extractor.action_logger import ActionLogger
+from src.listloc.extractor.listing_constants import ListingConstants
+
+class TestListingIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__BASE_DIRECTORY_PATH = self.__temp_dir.name
+        self.__SOURCE_FILE_PATH = os.path.join(self.__BASE_DIRECTORY_PATH, "source.py")
+        self.__LISTING_DIRECTORY_PATH = os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME)
+        self.__INDEX_FILE_PATH = os.path.join(self.__LISTING_DIRECTORY_PATH, ListingConstants.INDEX_FILE_NAME)
+        os.mkdir(self.__LISTING_DIRECTORY_PATH)
+        self.__logger = ActionLogger(self.__BASE_DIRECTORY_PATH)
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_record_and_save(self):
+        listing_index = ListingIndex(self.__logger)
+        listing_index.record(self.__SOURCE_FILE_PATH, [Listing("BEGIN LISTING foo\ncode\nEND LISTING", first_line=2)])
+        listing_index.save()
+        with open(self.__INDEX_FILE_PATH, "rt", encoding="utf-8") as f:
+            entries = json.load(f)["listings"]
+        expected_entry = {"source": "source.py", "first_line": 2, "last_line": 4, "sha256": ListingIndex.digest("code")}
+        self.assertEqual({"foo": expected_entry}, entries)
+        self.assertTrue(ListingIndex(self.__logger).covers(self.__SOURCE_FILE_PATH, ["foo"]))
+        self.assertFalse(ListingIndex(self.__logger).covers(self.__SOURCE_FILE_PATH, ["foo", "bar"]))
+
+    def test_unchanged_index_is_not_rewritten(self):
+        listing = Listing("BEGIN LISTING foo\ncode\nEND LISTING", first_line=1)
+        listing_index = ListingIndex(self.__logger)
+        listing_index.record(self.__SOURCE_FILE_PATH, [listing])
+        listing_index.save()
+        os.utime(self.__INDEX_FILE_PATH, ns=(0, 0))
+        listing_index = ListingIndex(self.__logger)
+        listing_index.record(self.__SOURCE_FILE_PATH, [listing])
+        listing_index.save()
+        self.assertEqual(0, os.stat(self.__INDEX_FILE_PATH).st_mtime_ns)
+
+    def test_forgetting_every_listing_deletes_index_and_directory(self):
+        listing_index = ListingIndex(self.__logger)
+        listing_index.record(self.__SOURCE_FILE_PATH, [Listing("BEGIN LISTING foo\ncode\nEND LISTING", first_line=1)])
+        listing_index.save()
+        listing_index.forget_listing(os.path.join(self.__LISTING_DIRECTORY_PATH, f"foo{ListingConstants.LISTING_FILE_EXTENSION}"))
+        listing_index.save()
+        self.assertFalse(os.path.isdir(self.__LISTING_DIRECTORY_PATH))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from src.listloc.extractor.listing_parser import ListingParser
+from src.listloc.extractor.listing_syntax import ListingSyntax
+
+class TestListingParser(unittest.TestCase):
+
+    def test_listings(self):
+        parser = self.__parse("code\n# BEGIN LISTING first\n\nline 1\n\nline 2\n# END LISTING\nBEGIN LISTING second\nline 3\n  % END LISTING trailing text")
+        self.assertEqual(["first", "second"], [listing.name for listing in parser.listings])
+        self.assertEqual(["line 1\n\nline 2", "line 3"], [listing.content for listing in parser.listings])
+
+    def test_line_ranges(self):
+        parser = self.__parse("code\n# BEGIN LISTING first\nline 1\n# END LISTING\nBEGIN LISTING second\n\nline 2\nEND LISTING")
+        self.assertEqual([(2, 4), (5, 8)], [listing.line_range for listing in parser.listings])
+
+    def test_unterminated_listing_is_ignored(self):
+        parser = self.__parse("BEGIN LISTING name\ncode")
+        self.assertEqual([], parser.listings)
+
+    def test_statements_on_one_line(self):
+        self.assertRaises(Exception, self.__parse, "BEGIN LISTING name code END LISTING")
+
+    def test_error_names_source_file(self):
+        self.assertRaisesRegex(Exception, "In file 'source.py': ", self.__parse, "BEGIN LISTING a b\ncode\nEND LISTING")
+
+    def test_configured_markers_and_comment_lines(self):
+        syntax = ListingSyntax([("BEGIN LISTING", "END LISTING"), ("@listing-start", "@listing-end")], {".py": ["#"]})
+        parser = self.__parse("x = 'BEGIN LISTING nope'\n  # @listing-start first\ns = 'END LISTING @listing-end'\n# @listing-end\n# BEGIN LISTING second\nline\n# END LISTING", syntax)
+        self.assertEqual(["first", "second"], [listing.name for listing in parser.listings])
+        self.assertEqual(["s = 'END LISTING @listing-end'", "line"], [listing.content for listing in parser.listings])
+        self.assertEqual([(2, 4), (5, 7)], [listing.line_range for listing in parser.listings])
+
+    @staticmethod
+    def __parse(text, syntax=None):
+        parser = ListingParser("source.py", syntax=syntax)
+        for line in text.split("\n"):
+            parser.feed_line(line)
+        return parser
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os
+import tempfile
+from src.listloc.extractor.listing_syntax import ListingSyntax
+from src.listloc.extractor.listing_constants import ListingConstants
+
+class TestListingSyntax(unittest.TestCase):
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__BASE_DIRECTORY_PATH = self.__temp_dir.name
+        self.__PYPROJECT_PATH = os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.PYPROJECT_FILE_NAME)
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_find_begin_prefers_longest_marker(self):
+        syntax = ListingSyntax([("@listing", "@end"), ("@listing-start", "@listing-end")])
+        self.assertEqual((5, "@listing-start"), syntax.find_begin("code @listing-start name"))
+        self.assertEqual((5, b"@listing"), syntax.find_begin(b"code @listing name"))
+        self.assertEqual("@listing-end", syntax.end_marker("@listing-start"))
+        self.assertEqual((-1, None), syntax.find_begin("BEGIN LISTING name"))
+
+    def test_find_begin_returns_first_of_unrelated_markers(self):
+        syntax = ListingSyntax([("BEGIN LISTING", "END LISTING"), ("#region", "#endregion")])
+        text = "code #region a BEGIN LISTING b #region c"
+        self.assertEqual((5, "#region"), syntax.find_begin(text))
+        self.assertEqual((15, "BEGIN LISTING"), syntax.find_begin(text, 6))
+        self.assertEqual((31, b"#region"), syntax.find_begin(text.encode("utf-8"), 16))
+        self.assertEqual((-1, None), syntax.find_begin(text, 32))
+
+    def test_invalid_markers(self):
+        for markers in [[], [("", "END")], [(" BEGIN", "END")], [("BEGIN", "END"), ("BEGIN", "STOP")]]:
+            self.assertRaises(ValueError, ListingSyntax, markers)
+        self.assertRaises(ValueError, ListingSyntax, comment_prefixes={".py": [""]})
+
+    def test_from_pyproject(self):
+        with open(self.__PYPROJECT_PATH, "wt", encoding="utf-8") as f:
+            f.write('[tool.listloc]\nmarkers = [{ begin = "@listing-start", end = "@listing-end" }]\n\n[tool.listloc.comment-prefixes]\n".py" = ["#"]\ntex = "%"\n')
+        syntax = ListingSyntax.from_pyproject(self.__BASE_DIRECTORY_PATH)
+        self.assertEqual("@listing-end", syntax.end_marker("@listing-start"))
+        self.assertEqual(("#",), syntax.comment_prefixes("module.py"))
+        self.assertEqual(("%",), syntax.comment_prefixes("paper.tex"))
+        self.assertIsNone(syntax.comment_prefixes("notes.txt"))
+        self.assertTrue(syntax.is_configuration_file(self.__PYPROJECT_PATH))
+        overridden = ListingSyntax.from_pyproject(self.__BASE_DIRECTORY_PATH, [("BEGIN", "END")], {".py": ["//"]})
+        self.assertEqual((-1, None), overridden.find_begin("@listing-start name"))
+        self.assertEqual(("//",), overridden.comment_prefixes("module.py"))
+        self.assertNotEqual(syntax.fingerprint, overridden.fingerprint)
+
+    def test_default_syntax_without_pyproject(self):
+        syntax = ListingSyntax.from_pyproject(self.__BASE_DIRECTORY_PATH)
+        self.assertIsNone(syntax.fingerprint)
+        self.assertEqual("END LISTING", syntax.end_marker("BEGIN LISTING"))
+        self.assertFalse(syntax.is_configuration_file(self.__PYPROJECT_PATH))
+
+if __name__ == "__main__":
+    unittest.main()
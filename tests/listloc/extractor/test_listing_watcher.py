@@ -0,0 +1,99 @@
+import unittest
+import os
+import json
+import tempfile
+from src.listloc.extractor.listing_watcher import ListingWatcher, PollingChangeSource, InotifyChangeSource
+from src.listloc.extractor.listing_constants import ListingConstants
+from src.listloc.extractor.listing_extractor import ListingExtractor
+from src.listloc.extractor.action_logger import ActionLogger
+from src.listloc.extractor.path_filter import PathFilter
+from src.listloc.extractor.tree_walker import TreeWalker
+
+class TestListingWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__BASE_DIRECTORY_PATH = self.__temp_dir.name
+        self.__SOURCE_FILE_PATH = os.path.join(self.__BASE_DIRECTORY_PATH, "source.py")
+        self.__LISTING_DIRECTORY_PATH = os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME)
+        self.__path_filter = PathFilter(self.__BASE_DIRECTORY_PATH)
+        self.__tree_walker = TreeWalker(self.__BASE_DIRECTORY_PATH, self.__path_filter)
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_extract_changed_listings(self):
+        self.__write_source_file("first", "second")
+        watcher = ListingWatcher(self.__BASE_DIRECTORY_PATH)
+        watcher.extract_all_listings()
+        self.assertEqual(["first.listing", "second.listing"], sorted(os.listdir(self.__LISTING_DIRECTORY_PATH)))
+        self.__write_source_file("first")
+        watcher.extract_changed_listings({self.__SOURCE_FILE_PATH})
+        self.assertEqual(["first.listing"], os.listdir(self.__LISTING_DIRECTORY_PATH))
+        os.remove(self.__SOURCE_FILE_PATH)
+        watcher.extract_changed_listings({self.__SOURCE_FILE_PATH})
+        self.assertFalse(os.path.exists(self.__LISTING_DIRECTORY_PATH))
+
+    def test_extract_changed_listings_updates_existing_index(self):
+        self.__write_source_file("first", "second")
+        ListingExtractor(self.__BASE_DIRECTORY_PATH, ActionLogger(self.__BASE_DIRECTORY_PATH), write_index=True).extract_all_listings()
+        index_file_path = os.path.join(self.__LISTING_DIRECTORY_PATH, ListingConstants.INDEX_FILE_NAME)
+        watcher = ListingWatcher(self.__BASE_DIRECTORY_PATH)
+        watcher.extract_all_listings()
+        self.__write_source_file("first", "third")
+        watcher.extract_changed_listings({self.__SOURCE_FILE_PATH})
+        with open(index_file_path, "rt", encoding="utf-8") as f:
+            self.assertEqual(["first", "third"], sorted(json.load(f)["listings"]))
+        os.remove(self.__SOURCE_FILE_PATH)
+        watcher.extract_changed_listings({self.__SOURCE_FILE_PATH})
+        self.assertFalse(os.path.exists(self.__LISTING_DIRECTORY_PATH))
+
+    def test_polling_change_source(self):
+        self.__write_source_file("first")
+        change_source = PollingChangeSource(self.__tree_walker, interval=0.01)
+        self.assertEqual(set(), change_source.wait_for_changes(debounce=0.01, timeout=0.05))
+        new_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, "new.py")
+        self.__write_file(new_file_path, "new")
+        os.remove(self.__SOURCE_FILE_PATH)
+        self.assertEqual({new_file_path, self.__SOURCE_FILE_PATH}, change_source.wait_for_changes(debounce=0.01, timeout=1))
+
+    @unittest.skipUnless(InotifyChangeSource.is_available(), "inotify is only available on Linux")
+    def test_inotify_change_source(self):
+        sub_directory_path = os.path.join(self.__BASE_DIRECTORY_PATH, "sub")
+        os.mkdir(sub_directory_path)
+        change_source = InotifyChangeSource(self.__tree_walker, self.__path_filter)
+        try:
+            self.assertEqual(set(), change_source.wait_for_changes(debounce=0.01, timeout=0.05))
+            new_file_path = os.path.join(sub_directory_path, "new.py")
+            self.__write_file(new_file_path, "new")
+            os.mkdir(os.path.join(self.__BASE_DIRECTORY_PATH, ".git"))
+            self.__write_file(os.path.join(self.__BASE_DIRECTORY_PATH, ".git", "HEAD"), "ref")
+            self.assertEqual({new_file_path}, change_source.wait_for_changes(debounce=0.05, timeout=1))
+        finally:
+            change_source.close()
+
+    @unittest.skipUnless(InotifyChangeSource.is_available(), "inotify is only available on Linux")
+    def test_extraction_does_not_trigger_inotify_change_source(self):
+        self.__write_source_file("first")
+        watcher = ListingWatcher(self.__BASE_DIRECTORY_PATH)
+        watcher.extract_all_listings()
+        change_source = InotifyChangeSource(self.__tree_walker, self.__path_filter)
+        try:
+            self.__write_source_file("first", "second")
+            changed_paths = change_source.wait_for_changes(debounce=0.05, timeout=1)
+            self.assertEqual({self.__SOURCE_FILE_PATH}, changed_paths)
+            watcher.extract_changed_listings(changed_paths)
+            self.assertEqual(set(), change_source.wait_for_changes(debounce=0.05, timeout=0.2))
+        finally:
+            change_source.close()
+
+    def __write_source_file(self, *listing_names):
+        self.__write_file(self.__SOURCE_FILE_PATH, "\n".join(f"BEGIN LISTING {name}\ncode\nEND LISTING" for name in listing_names))
+
+    @staticmethod
+    def __write_file(path, content):
+        with open(path, "wt", encoding="utf-8") as f:
+            f.write(content)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import os
+import tempfile
+from src.listloc.extractor.listing_writer import ListingWriter
+
+class TestListingWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__BASE_DIRECTORY_PATH = self.__temp_dir.name
+        self.__LISTING_FILE_PATH = os.path.join(self.__BASE_DIRECTORY_PATH, "foo.listing")
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_write_replaces_file_without_leftovers(self):
+        writer = ListingWriter()
+        writer.write(self.__LISTING_FILE_PATH, b"old")
+        writer.write(self.__LISTING_FILE_PATH, b"new")
+        with open(self.__LISTING_FILE_PATH, "rb") as f:
+            self.assertEqual(b"new", f.read())
+        self.assertEqual(["foo.listing"], os.listdir(self.__BASE_DIRECTORY_PATH))
+
+    def test_durable_write(self):
+        writer = ListingWriter(durable=True)
+        writer.write(self.__LISTING_FILE_PATH, b"content")
+        writer.flush()
+        with open(self.__LISTING_FILE_PATH, "rb") as f:
+            self.assertEqual(b"content", f.read())
+
+    def test_durable_writes_are_moved_into_place_by_flush(self):
+        writer = ListingWriter(durable=True)
+        writer.write(self.__LISTING_FILE_PATH, b"first")
+        writer.write(self.__LISTING_FILE_PATH, b"second")
+        self.assertFalse(os.path.exists(self.__LISTING_FILE_PATH))
+        writer.flush()
+        with open(self.__LISTING_FILE_PATH, "rb") as f:
+            self.assertEqual(b"second", f.read())
+        self.assertEqual(["foo.listing"], os.listdir(self.__BASE_DIRECTORY_PATH))
+
+    def test_failed_write_leaves_no_temporary_file(self):
+        os.mkdir(self.__LISTING_FILE_PATH)
+        self.assertRaises(OSError, ListingWriter().write, self.__LISTING_FILE_PATH, b"content")
+        self.assertEqual(["foo.listing"], os.listdir(self.__BASE_DIRECTORY_PATH))
+
+if __name__ == "__main__":
+    unittest.main()
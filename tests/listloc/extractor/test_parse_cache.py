@@ -0,0 +1,32 @@
+import unittest
+from src.listloc.extractor.parse_cache import ParseCache
+from src.listloc.extractor.listing import Listing
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.__LISTING = Listing("BEGIN LISTING foo\ncode\nEND LISTING")
+
+    def test_get_returns_cached_listings(self):
+        parse_cache = ParseCache()
+        self.assertIsNone(parse_cache.get("digest"))
+        parse_cache.put("digest", [self.__LISTING], 10)
+        self.assertEqual([self.__LISTING], parse_cache.get("digest"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        parse_cache = ParseCache(max_bytes=20)
+        parse_cache.put("first", [self.__LISTING], 10)
+        parse_cache.put("second", [self.__LISTING], 10)
+        parse_cache.get("first")
+        parse_cache.put("third", [self.__LISTING], 10)
+        self.assertIsNotNone(parse_cache.get("first"))
+        self.assertIsNone(parse_cache.get("second"))
+        self.assertIsNotNone(parse_cache.get("third"))
+
+    def test_entry_larger_than_cache_is_not_cached(self):
+        parse_cache = ParseCache(max_bytes=5)
+        parse_cache.put("digest", [self.__LISTING], 10)
+        self.assertEqual(0, len(parse_cache))
+
+if __name__ == "__main__":
+    unittest.main()
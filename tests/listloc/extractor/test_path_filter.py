@@ -0,0 +1,29 @@
+import unittest
+import os
+from src.listloc.extractor.path_filter import PathFilter
+from src.listloc.extractor.listing_constants import ListingConstants
+
+class TestPathFilter(unittest.TestCase):
+    __BASE_DIRECTORY_PATH = os.path.join("project")
+
+    def test_default_excluded_directories(self):
+        path_filter = PathFilter(self.__BASE_DIRECTORY_PATH)
+        for name in [".git", "node_modules", ".venv", "__pycache__", ListingConstants.LISTING_DIRECTORY_NAME]:
+            self.assertTrue(path_filter.excludes_directory(os.path.join(self.__BASE_DIRECTORY_PATH, "src", name)))
+        self.assertFalse(path_filter.excludes_directory(os.path.join(self.__BASE_DIRECTORY_PATH, "src")))
+
+    def test_cache_file_is_excluded(self):
+        path_filter = PathFilter(self.__BASE_DIRECTORY_PATH)
+        self.assertTrue(path_filter.excludes_file(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.CACHE_FILE_NAME)))
+        self.assertFalse(path_filter.excludes_file(os.path.join(self.__BASE_DIRECTORY_PATH, "main.py")))
+
+    def test_exclude_patterns(self):
+        path_filter = PathFilter(self.__BASE_DIRECTORY_PATH, ["*.log", "docs/build", "vendor/"])
+        self.assertTrue(path_filter.excludes_file(os.path.join(self.__BASE_DIRECTORY_PATH, "deep", "run.log")))
+        self.assertTrue(path_filter.excludes_directory(os.path.join(self.__BASE_DIRECTORY_PATH, "docs", "build")))
+        self.assertTrue(path_filter.excludes_directory(os.path.join(self.__BASE_DIRECTORY_PATH, "third_party", "vendor")))
+        self.assertFalse(path_filter.excludes_directory(os.path.join(self.__BASE_DIRECTORY_PATH, "build")))
+        self.assertFalse(path_filter.excludes_file(os.path.join(self.__BASE_DIRECTORY_PATH, "run.py")))
+
+if __name__ == "__main__":
+    unittest.main()
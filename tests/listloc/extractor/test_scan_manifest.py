@@ -0,0 +1,80 @@
+import unittest
+import os
+import tempfile
+from src.listloc.extractor.scan_manifest import ScanManifest
+from src.listloc.extractor.listing_constants import ListingConstants
+
+class TestScanManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__BASE_DIRECTORY_PATH = self.__temp_dir.name
+        self.__SOURCE_FILE_PATH = os.path.join(self.__BASE_DIRECTORY_PATH, "source.py")
+        with open(self.__SOURCE_FILE_PATH, "wb") as f:
+            f.write(b"BEGIN LISTING foo\nprint('hello')\nEND LISTING")
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_record_survives_save_and_load(self):
+        manifest = ScanManifest(self.__BASE_DIRECTORY_PATH)
+        stat_result = os.stat(self.__SOURCE_FILE_PATH)
+        manifest.record(self.__SOURCE_FILE_PATH, stat_result, "abc", ["foo"])
+        manifest.save()
+        reloaded = ScanManifest(self.__BASE_DIRECTORY_PATH)
+        entry = reloaded.entry(self.__SOURCE_FILE_PATH)
+        self.assertTrue(ScanManifest.entry_has_stat(entry, stat_result))
+        self.assertTrue(ScanManifest.entry_has_digest(entry, "abc"))
+        self.assertFalse(ScanManifest.entry_has_digest(entry, "def"))
+        self.assertEqual(["foo"], reloaded.listing_names(self.__SOURCE_FILE_PATH))
+
+    def test_changed_stat(self):
+        manifest = ScanManifest(self.__BASE_DIRECTORY_PATH)
+        manifest.record(self.__SOURCE_FILE_PATH, os.stat(self.__SOURCE_FILE_PATH), "abc", ["foo"])
+        with open(self.__SOURCE_FILE_PATH, "ab") as f:
+            f.write(b"\n")
+        self.assertFalse(ScanManifest.entry_has_stat(manifest.entry(self.__SOURCE_FILE_PATH), os.stat(self.__SOURCE_FILE_PATH)))
+
+    def test_unseen_source_paths(self):
+        manifest = ScanManifest(self.__BASE_DIRECTORY_PATH)
+        vanished_path = os.path.join(self.__BASE_DIRECTORY_PATH, "vanished.py")
+        manifest.record(self.__SOURCE_FILE_PATH, os.stat(self.__SOURCE_FILE_PATH), "abc", ["foo"])
+        manifest.record(vanished_path, os.stat(self.__SOURCE_FILE_PATH), "def", ["bar"])
+        manifest.mark_seen(self.__SOURCE_FILE_PATH)
+        self.assertEqual([vanished_path], manifest.unseen_source_paths())
+
+    def test_corrupt_manifest_is_ignored(self):
+        with open(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.CACHE_FILE_NAME), "wt") as f:
+            f.write("not json")
+        manifest = ScanManifest(self.__BASE_DIRECTORY_PATH)
+        self.assertEqual([], manifest.listing_names(self.__SOURCE_FILE_PATH))
+
+    def test_manifest_of_other_syntax_skips_nothing(self):
+        manifest = ScanManifest(self.__BASE_DIRECTORY_PATH)
+        stat_result = os.stat(self.__SOURCE_FILE_PATH)
+        manifest.record(self.__SOURCE_FILE_PATH, stat_result, "abc", ["foo"])
+        manifest.save()
+        reloaded = ScanManifest(self.__BASE_DIRECTORY_PATH, "other syntax")
+        self.assertIsNone(reloaded.entry(self.__SOURCE_FILE_PATH))
+        self.assertFalse(ScanManifest.entry_has_stat(None, stat_result))
+        self.assertEqual(["foo"], reloaded.listing_names(self.__SOURCE_FILE_PATH))
+
+    def test_unchanged_manifest_is_not_rewritten(self):
+        manifest = ScanManifest(self.__BASE_DIRECTORY_PATH)
+        stat_result = os.stat(self.__SOURCE_FILE_PATH)
+        manifest.record(self.__SOURCE_FILE_PATH, stat_result, "abc", ["foo"])
+        manifest.save()
+        manifest_path = os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.CACHE_FILE_NAME)
+        os.utime(manifest_path, ns=(0, 0))
+        reloaded = ScanManifest(self.__BASE_DIRECTORY_PATH)
+        reloaded.record(self.__SOURCE_FILE_PATH, stat_result, "abc", ["foo"])
+        reloaded.save()
+        self.assertEqual(0, os.stat(manifest_path).st_mtime_ns)
+
+    def test_discard(self):
+        ScanManifest(self.__BASE_DIRECTORY_PATH).save()
+        ScanManifest.discard(self.__BASE_DIRECTORY_PATH)
+        self.assertFalse(os.path.exists(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.CACHE_FILE_NAME)))
+
+if __name__ == "__main__":
+    unittest.main()
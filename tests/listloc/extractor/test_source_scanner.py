@@ -0,0 +1,41 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+from src.listloc.extractor.source_scanner import SourceScanner
+from src.listloc.extractor.parse_cache import ParseCache
+
+class TestSourceScanner(unittest.TestCase):
+    # Puts a '\r\n' across the first 1 MiB boundary of the memory-mapped file
+    __FILLER = "ab" + "x\r\n" * 400000
+    __LISTINGS = "# BEGIN LISTING first\r\ncode\r\n# END LISTING\n# BEGIN LISTING second\ncode\n# END LISTING\n"
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__SOURCE_FILE_PATH = os.path.join(self.__temp_dir.name, "huge_code.py")
+        with open(self.__SOURCE_FILE_PATH, "wb") as f:
+            f.write((self.__FILLER + self.__LISTINGS + self.__FILLER + self.__LISTINGS.replace("first", "third").replace("second", "fourth")).encode("utf-8"))
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_memory_mapped_scan_counts_lines_when_asked(self):
+        listings = SourceScanner(self.__SOURCE_FILE_PATH, count_lines=True).scan().listings
+        self.assertEqual([(400001, 400003), (400004, 400006), (800007, 800009), (800010, 800012)], [listing.line_range for listing in listings])
+
+    def test_memory_mapped_scan_does_not_count_lines_by_default(self):
+        with mock.patch.object(SourceScanner, "_SourceScanner__count_line_breaks", side_effect=AssertionError("line breaks counted")):
+            listings = SourceScanner(self.__SOURCE_FILE_PATH).scan().listings
+        self.assertEqual(["first", "second", "third", "fourth"], [listing.name for listing in listings])
+        self.assertEqual([None] * 4, [listing.line_range for listing in listings])
+
+    def test_parse_cache_only_hashes_files_with_begin_marker(self):
+        plain_file_path = os.path.join(self.__temp_dir.name, "plain.txt")
+        with open(plain_file_path, "wb") as f:
+            f.write(b"no listings\n")
+        self.assertIsNone(SourceScanner(plain_file_path, parse_cache=ParseCache()).scan().digest)
+        self.assertIsNotNone(SourceScanner(plain_file_path, track_changes=True).scan().digest)
+        self.assertIsNotNone(SourceScanner(self.__SOURCE_FILE_PATH, parse_cache=ParseCache()).scan().digest)
+
+if __name__ == "__main__":
+    unittest.main()
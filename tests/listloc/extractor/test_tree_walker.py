@@ -0,0 +1,49 @@
+import unittest
+import os
+import tempfile
+from src.listloc.extractor.tree_walker import TreeWalker
+from src.listloc.extractor.path_filter import PathFilter
+from src.listloc.extractor.listing_constants import ListingConstants
+
+class TestTreeWalker(unittest.TestCase):
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__BASE_DIRECTORY_PATH = self.__temp_dir.name
+        for directory in ["src", os.path.join("src", ListingConstants.LISTING_DIRECTORY_NAME), ".git"]:
+            os.mkdir(os.path.join(self.__BASE_DIRECTORY_PATH, directory))
+        for file in ["main.py", os.path.join("src", "module.py"), os.path.join("src", ListingConstants.LISTING_DIRECTORY_NAME, f"foo{ListingConstants.LISTING_FILE_EXTENSION}"), os.path.join("src", ListingConstants.LISTING_DIRECTORY_NAME, "notes.txt"), os.path.join(".git", "HEAD")]:
+            with open(os.path.join(self.__BASE_DIRECTORY_PATH, file), "wt") as f:
+                f.write("content")
+        self.__tree_walker = TreeWalker(self.__BASE_DIRECTORY_PATH, PathFilter(self.__BASE_DIRECTORY_PATH))
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_source_file_paths_and_listing_directories_in_one_pass(self):
+        listing_directories = []
+        source_file_paths = self.__tree_walker.source_file_paths(listing_directories=listing_directories)
+        expected_source_file_paths = [os.path.join(self.__BASE_DIRECTORY_PATH, "main.py"), os.path.join(self.__BASE_DIRECTORY_PATH, "src", "module.py")]
+        self.assertEqual(sorted(expected_source_file_paths), sorted(source_file_paths))
+        listing_directory_path = os.path.join(self.__BASE_DIRECTORY_PATH, "src", ListingConstants.LISTING_DIRECTORY_NAME)
+        self.assertEqual([listing_directory_path], [listing_directory.path for listing_directory in listing_directories])
+        self.assertEqual([os.path.join(listing_directory_path, f"foo{ListingConstants.LISTING_FILE_EXTENSION}")], listing_directories[0].listing_file_paths)
+
+    def test_directory_paths(self):
+        expected_directory_paths = [self.__BASE_DIRECTORY_PATH, os.path.join(self.__BASE_DIRECTORY_PATH, "src")]
+        self.assertEqual(expected_directory_paths, self.__tree_walker.directory_paths())
+
+    def test_directory_source_file_paths_and_listing_directory(self):
+        src_directory_path = os.path.join(self.__BASE_DIRECTORY_PATH, "src")
+        self.assertEqual([os.path.join(src_directory_path, "module.py")], self.__tree_walker.directory_source_file_paths(src_directory_path))
+        self.assertEqual(os.path.join(src_directory_path, ListingConstants.LISTING_DIRECTORY_NAME), self.__tree_walker.listing_directory(src_directory_path).path)
+        self.assertIsNone(self.__tree_walker.listing_directory(self.__BASE_DIRECTORY_PATH))
+
+    def test_excludes(self):
+        self.assertFalse(self.__tree_walker.excludes(os.path.join(self.__BASE_DIRECTORY_PATH, "src", "module.py"), False))
+        self.assertFalse(self.__tree_walker.excludes(os.path.join(self.__BASE_DIRECTORY_PATH, "src"), True))
+        self.assertTrue(self.__tree_walker.excludes(os.path.join(self.__BASE_DIRECTORY_PATH, ".git", "HEAD"), False))
+        self.assertTrue(self.__tree_walker.excludes(os.path.join(self.__BASE_DIRECTORY_PATH, "src", ListingConstants.LISTING_DIRECTORY_NAME, "notes.txt"), False))
+
+if __name__ == "__main__":
+    unittest.main()
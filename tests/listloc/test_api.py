@@ -0,0 +1,42 @@
+import unittest
+import os
+import tempfile
+from listloc import iter_listings, extract_to_dict
+from listloc.extractor.listing_constants import ListingConstants
+
+class TestAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.__temp_dir = tempfile.TemporaryDirectory()
+        self.__BASE_DIRECTORY_PATH = self.__temp_dir.name
+        os.mkdir(os.path.join(self.__BASE_DIRECTORY_PATH, "docs"))
+        self.__SOURCE_FILE_PATH = os.path.join(self.__BASE_DIRECTORY_PATH, "docs", "example.py")
+        with open(self.__SOURCE_FILE_PATH, "wt", encoding="utf-8") as f:
+            f.write("# BEGIN LISTING first\nprint(1)\n# END LISTING\n# BEGIN LISTING second\nprint(2)\n# END LISTING\n")
+
+    def tearDown(self):
+        self.__temp_dir.cleanup()
+
+    def test_iter_listings(self):
+        listings = [(source_path, listing.name, listing.content) for source_path, listing in iter_listings(self.__BASE_DIRECTORY_PATH)]
+        expected_listings = [(self.__SOURCE_FILE_PATH, "first", "print(1)"), (self.__SOURCE_FILE_PATH, "second", "print(2)")]
+        self.assertEqual(expected_listings, listings)
+
+    def test_extract_to_dict_writes_nothing(self):
+        listings = extract_to_dict(self.__BASE_DIRECTORY_PATH)
+        expected_listings = {
+            os.path.join("docs", ListingConstants.LISTING_DIRECTORY_NAME, f"first{ListingConstants.LISTING_FILE_EXTENSION}"): "print(1)",
+            os.path.join("docs", ListingConstants.LISTING_DIRECTORY_NAME, f"second{ListingConstants.LISTING_FILE_EXTENSION}"): "print(2)",
+        }
+        self.assertEqual(expected_listings, listings)
+        self.assertEqual(["example.py"], os.listdir(os.path.join(self.__BASE_DIRECTORY_PATH, "docs")))
+
+    def test_extract_to_dict_from_source_file(self):
+        listings = extract_to_dict(self.__SOURCE_FILE_PATH)
+        self.assertEqual(["first", "second"], [os.path.splitext(os.path.basename(path))[0] for path in listings])
+
+    def test_invalid_path(self):
+        self.assertRaises(FileNotFoundError, extract_to_dict, os.path.join(self.__BASE_DIRECTORY_PATH, "missing"))
+
+if __name__ == "__main__":
+    unittest.main()
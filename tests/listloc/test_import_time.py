@@ -0,0 +1,45 @@
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+import listloc
+
+# Import time that listloc.main may add on top of typer, in microseconds. The best of a few
+# runs is compared, so that a busy machine does not fail the test. Raise it deliberately.
+IMPORT_TIME_BUDGET_US = 150_000
+IMPORT_TIME_RUNS = 3
+SOURCE_DIRECTORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(listloc.__file__)))
+
+
+def run_python(code, *options):
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SOURCE_DIRECTORY_PATH, os.environ.get("PYTHONPATH")])))
+    return subprocess.run([sys.executable, *options, "-c", code], check=True, capture_output=True, text=True, env=environment)
+
+
+def import_time_us(module_name):
+    # typer is imported first, so that only the cumulative time of the listloc modules is measured
+    stderr = run_python(f"import typer; import {module_name}", "-X", "importtime").stderr
+    match = re.search(rf"^import time:\s+\d+ \|\s+(\d+) \| {re.escape(module_name)}$", stderr, flags=re.MULTILINE)
+    return int(match.group(1))
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_main_import_time_within_budget(self):
+        best_time_us = min(import_time_us("listloc.main") for _ in range(IMPORT_TIME_RUNS))
+        self.assertLessEqual(best_time_us, IMPORT_TIME_BUDGET_US)
+
+    def test_main_import_defers_optional_modules(self):
+        modules = ["concurrent.futures", "multiprocessing", "ctypes", "listloc.extractor.listing_watcher"]
+        stdout = run_python(f"import sys, listloc.main; print([m for m in {modules!r} if m in sys.modules])").stdout
+        self.assertEqual("[]", stdout.strip())
+
+    def test_library_import_does_not_import_rich(self):
+        stdout = run_python("import sys, listloc, listloc.extractor.action_logger; print('rich' in sys.modules)").stdout
+        self.assertEqual("False", stdout.strip())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 import tempfile
 import os
+import json
+import pstats
 from typer.testing import CliRunner
 from listloc.main import app, get_version_from_metadata
 from listloc.extractor.listing_constants import ListingConstants
@@ -40,6 +42,12 @@ class TestCLI(unittest.TestCase):
         self.assertTrue(self.__listing_file_present())
         self.assertEqual(f"Extracted a total of 1 listing from 1 source file\n", result.output)
 
+    def test_extract_listing_with_jobs_option(self):
+        self.__write_source_file_with_listing()
+        result = runner.invoke(app, ["extract", "--jobs", "4", self.__BASE_DIRECTORY_PATH])
+        self.assertTrue(self.__listing_file_present())
+        self.assertEqual(f"Extracted a total of 1 listing from 1 source file\n", result.output)
+
     def test_extract_with_prune_option(self):
         self.__write_source_file_with_listing()
         self.__write_stale_listing_file()
@@ -54,15 +62,107 @@ class TestCLI(unittest.TestCase):
         self.__write_stale_listing_file()
         result = runner.invoke(app, ["extract", "--prune", "--verbose", self.__BASE_DIRECTORY_PATH])
         expected_detailed_log = f"""
-Deleted '{os.path.join(self.__BASE_DIRECTORY_PATH, "listings", "outdated.listing")}'
-Removed '{os.path.join(self.__BASE_DIRECTORY_PATH, "listings")}'
 Extracted 1 listing from '{os.path.join(self.__BASE_DIRECTORY_PATH, "example.txt")}'
-Created '{os.path.join(self.__BASE_DIRECTORY_PATH, "listings")}'
-Wrote '{os.path.join(self.__BASE_DIRECTORY_PATH, "listings", "foo.listing")}'"""
+Wrote '{os.path.join(self.__BASE_DIRECTORY_PATH, "listings", "foo.listing")}'
+Deleted '{os.path.join(self.__BASE_DIRECTORY_PATH, "listings", "outdated.listing")}'"""
         self.assertIn(expected_detailed_log.replace("\n", ""), result.output.replace("\n", ""))
         expected_summary = "Deleted a total of 1 extracted listing\nExtracted a total of 1 listing from 1 source file\n"
         self.assertIn(expected_summary, result.output)
 
+    def test_extract_skips_unchanged_source_files(self):
+        self.__write_source_file_with_listing()
+        runner.invoke(app, ["extract", self.__BASE_DIRECTORY_PATH])
+        result = runner.invoke(app, ["extract", self.__BASE_DIRECTORY_PATH])
+        self.assertEqual("Skipped 1 unchanged source file\n", result.output)
+        result = runner.invoke(app, ["extract", "--no-cache", self.__BASE_DIRECTORY_PATH])
+        self.assertEqual("Extracted a total of 1 listing from 1 source file\nLeft 1 listing unchanged\n", result.output)
+
+    def test_extract_removes_listings_of_deleted_source_file(self):
+        self.__write_source_file_with_listing()
+        runner.invoke(app, ["extract", self.__BASE_DIRECTORY_PATH])
+        os.remove(os.path.join(self.__BASE_DIRECTORY_PATH, "example.txt"))
+        result = runner.invoke(app, ["extract", self.__BASE_DIRECTORY_PATH])
+        self.assertFalse(self.__listing_file_present())
+        self.assertEqual("Deleted a total of 1 extracted listing\n", result.output)
+
+    def test_extract_with_prune_option_leaves_unchanged_listings_untouched(self):
+        self.__write_source_file_with_listing()
+        runner.invoke(app, ["extract", self.__BASE_DIRECTORY_PATH])
+        listing_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME, f"foo{ListingConstants.LISTING_FILE_EXTENSION}")
+        os.utime(listing_file_path, ns=(0, 0))
+        self.__write_file(self.__STALE_LISTING_FILE_PATH, "outdated listing here")
+        result = runner.invoke(app, ["extract", "--prune", "--no-cache", self.__BASE_DIRECTORY_PATH])
+        self.assertEqual(0, os.stat(listing_file_path).st_mtime_ns)
+        self.assertFalse(os.path.exists(self.__STALE_LISTING_FILE_PATH))
+        self.assertEqual("Deleted a total of 1 extracted listing\nExtracted a total of 1 listing from 1 source file\nLeft 1 listing unchanged\n", result.output)
+
+    def test_extract_with_files_from_standard_input(self):
+        self.__write_source_file_with_listing()
+        self.__write_file(os.path.join(self.__BASE_DIRECTORY_PATH, "other.txt"), "BEGIN LISTING bar\nprint('bar')\nEND LISTING")
+        result = runner.invoke(app, ["extract", "--base", self.__BASE_DIRECTORY_PATH, "--files-from", "-"], input=f"{os.path.join(self.__BASE_DIRECTORY_PATH, 'example.txt')}\n\n")
+        self.assertTrue(self.__listing_file_present())
+        self.assertFalse(os.path.exists(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME, f"bar{ListingConstants.LISTING_FILE_EXTENSION}")))
+        self.assertEqual("Extracted a total of 1 listing from 1 source file\n", result.output)
+
+    def test_extract_base_directory_without_paths(self):
+        os.mkdir(os.path.join(self.__BASE_DIRECTORY_PATH, "sub"))
+        self.__write_file(os.path.join(self.__BASE_DIRECTORY_PATH, "sub", "a.txt"), "BEGIN LISTING foo\nprint('foo')\nEND LISTING")
+        result = runner.invoke(app, ["extract", "--base", self.__BASE_DIRECTORY_PATH])
+        self.assertTrue(os.path.isfile(os.path.join(self.__BASE_DIRECTORY_PATH, "sub", ListingConstants.LISTING_DIRECTORY_NAME, f"foo{ListingConstants.LISTING_FILE_EXTENSION}")))
+        self.assertEqual("Extracted a total of 1 listing from 1 source file\n", result.output)
+
+    def test_extract_with_markers_from_pyproject_and_options(self):
+        self.__write_file(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.PYPROJECT_FILE_NAME), '[tool.listloc]\nmarkers = [{ begin = "@listing-start", end = "@listing-end" }]\n')
+        self.__write_file(os.path.join(self.__BASE_DIRECTORY_PATH, "example.py"), "x = 'BEGIN LISTING nope'\n# @listing-start foo\nprint('hello')\n# @listing-end\n# <<< bar\nprint('bar')\n# >>>")
+        result = runner.invoke(app, ["extract", self.__BASE_DIRECTORY_PATH])
+        self.assertEqual(["foo.listing"], os.listdir(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME)))
+        self.assertEqual("Extracted a total of 1 listing from 1 source file\n", result.output)
+        result = runner.invoke(app, ["extract", "--begin-marker", "<<<", "--end-marker", ">>>", "--comment-prefix", ".py=#", self.__BASE_DIRECTORY_PATH])
+        self.assertEqual(["bar.listing"], os.listdir(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME)))
+        self.assertEqual("Deleted a total of 1 extracted listing\nExtracted a total of 1 listing from 1 source file\n", result.output)
+
+    def test_extract_nonexistent_path(self):
+        missing_path = os.path.join(self.__BASE_DIRECTORY_PATH, "missing")
+        result = runner.invoke(app, ["extract", missing_path])
+        self.assertIsInstance(result.exception, NotADirectoryError)
+        self.__write_source_file_with_listing()
+        result = runner.invoke(app, ["extract", "--base", self.__BASE_DIRECTORY_PATH, os.path.join(self.__BASE_DIRECTORY_PATH, "example.txt"), missing_path])
+        self.assertIsInstance(result.exception, FileNotFoundError)
+        self.assertFalse(os.path.exists(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.CACHE_FILE_NAME)))
+
+    def test_extract_bundle_and_get_listing(self):
+        self.__write_source_file_with_listing()
+        result = runner.invoke(app, ["extract", "--format", "bundle", self.__BASE_DIRECTORY_PATH])
+        self.assertFalse(self.__listing_file_present())
+        self.assertTrue(os.path.isfile(os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.BUNDLE_FILE_NAME)))
+        self.assertEqual("Extracted a total of 1 listing from 1 source file\n", result.output)
+        result = runner.invoke(app, ["get", "foo", self.__BASE_DIRECTORY_PATH])
+        self.assertEqual("print('hello')\n", result.output)
+        result = runner.invoke(app, ["export", self.__BASE_DIRECTORY_PATH])
+        self.assertEqual("\\begin{filecontents*}[overwrite]{foo.listing}\nprint('hello')\n\\end{filecontents*}\n", result.output)
+
+    def test_extract_with_stats_and_profile(self):
+        self.__write_source_file_with_listing()
+        stats_path = os.path.join(self.__BASE_DIRECTORY_PATH, "stats.json")
+        profile_path = os.path.join(self.__BASE_DIRECTORY_PATH, "extract.prof")
+        result = runner.invoke(app, ["extract", "--stats", "--stats-output", stats_path, "--profile", profile_path, self.__BASE_DIRECTORY_PATH])
+        self.assertIn("listing_construction", result.output)
+        with open(stats_path, "rt", encoding="utf-8") as f:
+            self.assertEqual(1, json.load(f)["counts"]["listings_written"])
+        self.assertGreater(pstats.Stats(profile_path).total_calls, 0)
+
+    def test_extract_and_clear_with_ndjson_output(self):
+        self.__write_source_file_with_listing()
+        listing_file_path = os.path.join(self.__BASE_DIRECTORY_PATH, ListingConstants.LISTING_DIRECTORY_NAME, f"foo{ListingConstants.LISTING_FILE_EXTENSION}")
+        result = runner.invoke(app, ["extract", "--output", "ndjson", self.__BASE_DIRECTORY_PATH])
+        events = [json.loads(line) for line in result.output.splitlines()]
+        self.assertEqual(["extracted", "created", "written", "summary"], [event["event"] for event in events])
+        self.assertEqual(listing_file_path, events[2]["path"])
+        result = runner.invoke(app, ["clear", "--output", "json", self.__BASE_DIRECTORY_PATH])
+        document = json.loads(result.output)
+        self.assertEqual(["deleted", "removed"], [event["event"] for event in document["events"]])
+        self.assertEqual(1, document["summary"]["deleted_listings"])
+
     def test_clear_no_listings(self):
         result = runner.invoke(app, ["clear", self.__BASE_DIRECTORY_PATH])
         self.assertFalse(self.__listing_file_present())